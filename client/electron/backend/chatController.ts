@@ -1,6 +1,6 @@
 import type { Express, Request, Response } from "express";
 import { Op } from "sequelize";
-import { generateStructuredJson, describeImage, getActiveModelName, embedText } from "./utils/llm";
+import { generateStructuredJson, describeImage, getActiveModelName, embedSingleText, embedTextToMatrix } from "./utils/llm";
 import type { ProviderName } from "./utils/llm";
 import { normalizeProviderName, isProviderValueProvided, respondWithInvalidProvider } from "./utils/providerHelper";
 import { logger } from "../logger";
@@ -22,10 +22,14 @@ import ChunkModel, { type ChunkAttributes } from "./models/chunk";
 import FileModel, { type FileAttributes } from "./models/file";
 import {
   isFaissAvailable,
-  globalIndexExists,
   searchGlobalFaissIndex,
 } from "./utils/vectorStore";
-import faiss from "faiss-node";
+import {
+  dotProductBatch,
+  isUnitNormalized,
+  squaredL2DistanceBatch,
+  topKIndices,
+} from "./utils/vectorMath";
 
 export function registerChatRoutes(app: Express) {
   // POST /api/chat/recommend-directory
@@ -120,33 +124,11 @@ export async function chatRecommendDirectoryHandler(
       currentStructure,
     });
 
-    const responseFormat = {
-      json_schema: {
-        name: "chat_recommend_directory_schema",
-        schema: {
-          type: "object",
-          properties: {
-            recommended_directory: { type: "string" },
-            confidence: { type: "number" },
-            reasoning: { type: "string" },
-            alternatives: { type: "array", items: { type: "string" } },
-          },
-          required: [
-            "recommended_directory",
-            "confidence",
-            "reasoning",
-            "alternatives",
-          ],
-        },
-        strict: true,
-      },
-    } as const;
-
     let result: unknown;
     try {
       result = await generateStructuredJson(
         messages,
-        responseFormat,
+        RECOMMEND_DIRECTORY_RESPONSE_FORMAT,
         temperature,
         maxTokens,
         undefined,
@@ -1169,6 +1151,56 @@ const QA_RESPONSE_FORMAT = {
   },
 } as const;
 
+const RECOMMEND_DIRECTORY_RESPONSE_FORMAT = {
+  json_schema: {
+    name: "chat_recommend_directory_schema",
+    schema: {
+      type: "object",
+      properties: {
+        recommended_directory: { type: "string" },
+        confidence: { type: "number" },
+        reasoning: { type: "string" },
+        alternatives: { type: "array", items: { type: "string" } },
+      },
+      required: [
+        "recommended_directory",
+        "confidence",
+        "reasoning",
+        "alternatives",
+      ],
+    },
+    strict: true,
+  },
+} as const;
+
+const DIRECTORY_STRUCTURE_RESPONSE_FORMAT = {
+  json_schema: {
+    name: "directory_schema",
+    schema: {
+      type: "object",
+      properties: {
+        directories: {
+          type: "array",
+          items: {
+            type: "object",
+            properties: {
+              path: {
+                type: "string",
+              },
+              description: {
+                type: "string",
+              },
+            },
+            required: ["path", "description"],
+          },
+        },
+      },
+      required: ["directories"],
+    },
+    strict: true,
+  },
+} as const;
+
 const QUERY_PURPOSE_VALUES = ["retrieval", "summary"] as const;
 type QueryPurpose = (typeof QUERY_PURPOSE_VALUES)[number];
 
@@ -1353,15 +1385,25 @@ function buildDocumentContentFromChunks(
   return parts.join("\n");
 }
 
-function buildSnippet(text: string, keyword?: string, maxLength = 240): string {
+function escapeRegExp(value: string): string {
+  return value.replace(/[.*+?^${}()|[\]\\]/g, "\\$&");
+}
+
+// Case-insensitive matcher for a search keyword, built once per search and
+// shared by every snippet of that search
+function buildKeywordPattern(keyword: string): RegExp | null {
+  const normalized = keyword.trim();
+  return normalized ? new RegExp(escapeRegExp(normalized), "i") : null;
+}
+
+function buildSnippet(text: string, pattern: RegExp | null, maxLength = 240): string {
   if (!text) return "";
-  const normalized = keyword?.trim();
-  if (!normalized) {
+  if (!pattern) {
     return createDefaultSnippet(text, maxLength);
   }
-  const lowerText = text.toLowerCase();
-  const lowerKeyword = normalized.toLowerCase();
-  const index = lowerText.indexOf(lowerKeyword);
+  // Search the original text: avoids lowercasing a full copy of the chunk
+  // and keeps the index valid for the text we slice
+  const index = text.search(pattern);
   if (index === -1) {
     return createDefaultSnippet(text, maxLength);
   }
@@ -1404,50 +1446,51 @@ function keywordScoreForReason(reason: MatchReason): number {
   }
 }
 
+// Uses the search's precompiled case-insensitive pattern, so no lowercased
+// copies of names, categories or tags are allocated per file
 function determineFileMatchReason(
   file: FileAttributes,
-  keyword: string
+  pattern: RegExp | null
 ): MatchReason {
-  const normalized = keyword.trim().toLowerCase();
-  if (!normalized) return "keyword-name";
-  if (file.name?.toLowerCase().includes(normalized)) {
+  if (!pattern) return "keyword-name";
+  if (file.name && pattern.test(file.name)) {
     return "keyword-name";
   }
-  if (file.category?.toLowerCase().includes(normalized)) {
+  if (file.category && pattern.test(file.category)) {
     return "keyword-category";
   }
   const tagsArray = parseTags(file.tags);
-  if (tagsArray.some((tag) => tag.toLowerCase().includes(normalized))) {
+  if (tagsArray.some((tag) => pattern.test(tag))) {
     return "keyword-tag";
   }
   return "keyword-name";
 }
 
+function toFilterSet(values?: string[]): Set<string> | null {
+  return values && values.length > 0 ? new Set(values) : null;
+}
+
 function filterRowsByFileFilters(
   rows: HydratedChunkRow[],
   filters: ParsedFileFilters
 ): HydratedChunkRow[] {
+  // Normalize file type filters once instead of per row
+  const fileTypeFilter =
+    filters.file_types && filters.file_types.length > 0
+      ? new Set(filters.file_types.map((value) => value.toLowerCase()))
+      : null;
+  const fileIdFilter = toFilterSet(filters.file_ids);
+  const categoryFilter = toFilterSet(filters.categories);
+  const tagFilter = toFilterSet(filters.tags);
   return rows.filter((row) => {
-    if (filters.file_ids && filters.file_ids.length > 0) {
-      if (!filters.file_ids.includes(row.file_id)) return false;
+    if (fileIdFilter && !fileIdFilter.has(row.file_id)) return false;
+    if (categoryFilter && !categoryFilter.has(row.file_category)) return false;
+    if (tagFilter && !row.tags_array.some((tag) => tagFilter.has(tag))) {
+      return false;
     }
-    if (filters.categories && filters.categories.length > 0) {
-      if (!filters.categories.includes(row.file_category)) return false;
-    }
-    if (filters.tags && filters.tags.length > 0) {
-      if (!row.tags_array.some((tag) => filters.tags!.includes(tag))) {
-        return false;
-      }
-    }
-    if (filters.file_types && filters.file_types.length > 0) {
+    if (fileTypeFilter) {
       const normalizedRowType = row.file_type?.toLowerCase() ?? "";
-      if (!normalizedRowType) {
-        return false;
-      }
-      const normalizedFilters = filters.file_types.map((value) =>
-        value.toLowerCase()
-      );
-      if (!normalizedFilters.includes(normalizedRowType)) {
+      if (!normalizedRowType || !fileTypeFilter.has(normalizedRowType)) {
         return false;
       }
     }
@@ -1558,6 +1601,7 @@ async function performKeywordSearch(
   }
 
   const likePattern = `%${escapeForLike(sanitized)}%`;
+  const keywordPattern = buildKeywordPattern(sanitized);
   const chunkLimit = Math.max(contextLimit * 6, 10);
   const fileLimit = Math.max(contextLimit * 4, 5);
 
@@ -1579,7 +1623,7 @@ async function performKeywordSearch(
       chunkRecordId: chunk.id,
       score: keywordScoreForReason("keyword-content"),
       matchReason: "keyword-content",
-      snippet: buildSnippet(chunk.content, sanitized),
+      snippet: buildSnippet(chunk.content, keywordPattern),
     });
   }
 
@@ -1595,15 +1639,15 @@ async function performKeywordSearch(
     raw: true,
   }).catch(() => [])) as FileAttributes[];
 
-  const fileIdSet = new Set<string>();
+  const fileById = new Map<string, FileAttributes>();
   for (const file of fileMatches) {
-    if (file.file_id) {
-      fileIdSet.add(file.file_id);
+    if (file.file_id && !fileById.has(file.file_id)) {
+      fileById.set(file.file_id, file);
     }
   }
 
-  if (fileIdSet.size > 0) {
-    const fileIds = Array.from(fileIdSet);
+  if (fileById.size > 0) {
+    const fileIds = Array.from(fileById.keys());
     const fileChunks = (await ChunkModel.findAll({
       where: { file_id: fileIds },
       order: [
@@ -1619,9 +1663,9 @@ async function performKeywordSearch(
       if (!chunk.file_id) continue;
       if (seenFile.has(chunk.file_id)) continue;
       seenFile.add(chunk.file_id);
-      const fileMeta = fileMatches.find((f) => f.file_id === chunk.file_id);
+      const fileMeta = fileById.get(chunk.file_id);
       const reason = fileMeta
-        ? determineFileMatchReason(fileMeta, sanitized)
+        ? determineFileMatchReason(fileMeta, keywordPattern)
         : "keyword-name";
       const score = keywordScoreForReason(reason);
       if (!prefetched.has(chunk.id)) {
@@ -1631,7 +1675,7 @@ async function performKeywordSearch(
         chunkRecordId: chunk.id,
         score,
         matchReason: reason,
-        snippet: buildSnippet(chunk.content, sanitized),
+        snippet: buildSnippet(chunk.content, keywordPattern),
       });
     }
   }
@@ -1660,14 +1704,14 @@ async function performVectorSearch(
 ): Promise<{ rows: HydratedChunkRow[]; retrievalTimeMs: number; embeddingTimeMs: number }> {
   const start = Date.now();
   const embeddingStart = Date.now();
-  const emb = await embedText([question]);
-  const qEmbedding = emb[0] ?? [];
+  const qEmbedding = await embedSingleText(question);
   if (qEmbedding.length === 0) {
     throw new Error("empty embedding");
   }
   const embeddingTimeMs = Date.now() - embeddingStart;
 
-  if (!isFaissAvailable() || !(await globalIndexExists())) {
+  // A missing index is detected by the search's own stat and yields no ids
+  if (!isFaissAvailable()) {
     return { rows: [], retrievalTimeMs: Date.now() - start, embeddingTimeMs };
   }
 
@@ -2654,7 +2698,7 @@ export async function chatAskHandlerMode1(
   }
 }
 
-// Mode2: Build an in-memory FAISS index from filtered files, then search
+// Mode2: Embed chunks of the filtered files and score them in memory, then search
 export async function chatAskHandlerMode2(
   req: Request,
   res: Response
@@ -2722,26 +2766,19 @@ export async function chatAskHandlerMode2(
     }>;
     let allowedFileIds = new Set<string>();
     if (allFiles.length > 0) {
+      const fileIdFilter = toFilterSet(parsedFileFilters.file_ids);
+      const categoryFilter = toFilterSet(parsedFileFilters.categories);
+      const tagFilter = toFilterSet(parsedFileFilters.tags);
       for (const f of allFiles) {
         // file_ids filter
-        if (
-          parsedFileFilters.file_ids &&
-          parsedFileFilters.file_ids.length > 0 &&
-          !parsedFileFilters.file_ids.includes(f.file_id)
-        )
-          continue;
+        if (fileIdFilter && !fileIdFilter.has(f.file_id)) continue;
         // categories filter
-        if (
-          parsedFileFilters.categories &&
-          parsedFileFilters.categories.length > 0 &&
-          !parsedFileFilters.categories.includes(f.category)
-        )
-          continue;
+        if (categoryFilter && !categoryFilter.has(f.category)) continue;
         // tags filter (OR semantics)
-        if (parsedFileFilters.tags && parsedFileFilters.tags.length > 0) {
+        if (tagFilter) {
           try {
             const tagsArr = f.tags ? (JSON.parse(f.tags) as string[]) : [];
-            if (!parsedFileFilters.tags.some((t) => tagsArr.includes(t)))
+            if (!tagsArr.some((t) => tagFilter.has(t)))
               continue;
           } catch {
             continue;
@@ -2801,8 +2838,7 @@ export async function chatAskHandlerMode2(
     const t0 = Date.now();
     let qEmbedding: number[] = [];
     try {
-  const emb = await embedText([question]);
-      qEmbedding = emb[0] ?? [];
+      qEmbedding = await embedSingleText(question);
       if (qEmbedding.length === 0) throw new Error("empty embedding");
     } catch (e) {
       logger.error("/api/chat/ask(mode2) embed failed", e as unknown);
@@ -2822,15 +2858,16 @@ export async function chatAskHandlerMode2(
     }
     const embedMs = Date.now() - t0;
 
-    // Build in-memory FAISS index for filtered chunks by embedding their contents
+    // Embed the filtered chunks straight into a packed float32 matrix
     // To reduce cost, cap number of chunks embedded to a reasonable upper bound (e.g., 2000)
     const MAX_CHUNKS = 2000;
     const selectedChunks = chunks.slice(0, MAX_CHUNKS);
     const texts = selectedChunks.map((c) => c.content);
 
-    let vectors: number[][] = [];
+    let matrix = new Float32Array(0);
+    let dim = 0;
     try {
-  vectors = await embedText(texts);
+      ({ matrix, dim } = await embedTextToMatrix(texts));
     } catch (e) {
       logger.error("/api/chat/ask(mode2) chunk embedding failed", e as unknown);
       res.status(500).json({
@@ -2848,7 +2885,6 @@ export async function chatAskHandlerMode2(
       return;
     }
 
-    const dim = vectors[0]?.length ?? 0;
     if (!dim) {
       res.status(500).json({
         success: false,
@@ -2865,47 +2901,14 @@ export async function chatAskHandlerMode2(
       return;
     }
 
-    // Create in-memory index and add vectors
-    let index: faiss.Index;
-    try {
-      const { IndexFlatL2 } = faiss as unknown as {
-        IndexFlatL2: new (d: number) => faiss.Index;
-      };
-      index = new IndexFlatL2(dim);
-    } catch (e) {
-      logger.error("Failed to create in-memory FAISS index", e as unknown);
-      res.status(500).json({
-        success: false,
-        message: "search_error",
-        data: null,
-        error: {
-          code: "VECTOR_INDEX_ERROR",
-          message: (e as Error).message,
-          details: null,
-        },
-        timestamp: new Date().toISOString(),
-        request_id: "",
-      });
-      return;
-    }
-
-    // Flatten and add
-    try {
-      const flat: number[] = new Array(vectors.length * dim);
-      for (let i = 0; i < vectors.length; i++) {
-        const row = vectors[i]!;
-        for (let d = 0; d < dim; d++) flat[i * dim + d] = row[d]!;
-      }
-      index.add(flat);
-    } catch (e) {
-      logger.error("Failed to add vectors to in-memory FAISS", e as unknown);
+    if (qEmbedding.length !== dim) {
       res.status(500).json({
         success: false,
-        message: "search_error",
+        message: "embedding_error",
         data: null,
         error: {
-          code: "VECTOR_INDEX_ADD_ERROR",
-          message: (e as Error).message,
+          code: "EMBED_ERROR",
+          message: `Question embedding dimension ${qEmbedding.length} does not match chunk dimension ${dim}`,
           details: null,
         },
         timestamp: new Date().toISOString(),
@@ -2914,16 +2917,26 @@ export async function chatAskHandlerMode2(
       return;
     }
 
-    // Perform search
+    // Score all candidate chunks against the question directly; the candidate
+    // set is capped above, so building a throwaway FAISS index only adds copies
     const t1 = Date.now();
     const k = Math.min(100, contextLimit * 5);
-    const resFaiss = index.search(qEmbedding, Math.min(index.ntotal(), k));
-    const labels = resFaiss.labels.filter((lbl) => lbl !== -1);
-    const distances = resFaiss.distances.slice(0, labels.length);
+    // Score on the same scale as mode1 and the default threshold,
+    // 1 / (1 + squared L2). For unit vectors squared L2 is 2 - 2 * dot, so
+    // per-row norm computation is skipped when the provider normalizes.
+    const scores = new Float32Array(Math.floor(matrix.length / dim));
+    if (isUnitNormalized(qEmbedding, dim) && isUnitNormalized(matrix, dim)) {
+      const dots = dotProductBatch(qEmbedding, matrix, dim);
+      for (let i = 0; i < dots.length; i++) scores[i] = 1 / (3 - 2 * dots[i]);
+    } else {
+      const distances = squaredL2DistanceBatch(qEmbedding, matrix, dim);
+      for (let i = 0; i < distances.length; i++) scores[i] = 1 / (1 + distances[i]);
+    }
+    const labels = topKIndices(scores, k);
     const retrievalMs = Date.now() - t1 + embedMs;
 
-    // Convert distances to similarity scores in [0,1]
-    const simScores = distances.map((d) => 1 / (1 + d));
+    // Relevance score per selected label (same order as labels)
+    const simScores = labels.map((i) => scores[i]);
 
     // Build rows from selectedChunks order (labels map directly to index order)
     const rows: Array<{
@@ -3001,27 +3014,13 @@ export async function chatAskHandlerMode2(
       .join("\n\n");
 
     const messages = buildChatAskMessages({ question, contextStr });
-    const responseFormat = {
-      json_schema: {
-        name: "chat_qa_answer_schema",
-        schema: {
-          type: "object",
-          properties: {
-            answer: { type: "string" },
-            confidence: { type: "number" },
-          },
-          required: ["answer", "confidence"],
-        },
-        strict: true,
-      },
-    } as const;
 
     const tGen = Date.now();
     let genObj: Record<string, unknown> = {};
     try {
       const result = await generateStructuredJson(
         messages,
-        responseFormat,
+        QA_RESPONSE_FORMAT,
         tempClamped,
         maxTokensClamped
       );
@@ -3171,39 +3170,11 @@ export async function chatDirectoryStructureHandler(
       maxDirectories,
       style,
     });
-    const responseFormat = {
-      json_schema: {
-        name: "directory_schema",
-        schema: {
-          type: "object",
-          properties: {
-            directories: {
-              type: "array",
-              items: {
-                type: "object",
-                properties: {
-                  path: {
-                    type: "string",
-                  },
-                  description: {
-                    type: "string",
-                  },
-                },
-                required: ["path", "description"],
-              },
-            },
-          },
-          required: ["directories"],
-        },
-        strict: true,
-      },
-    } as const;
-
     let result: unknown;
     try {
       result = await generateStructuredJson(
         messages,
-        responseFormat,
+        DIRECTORY_STRUCTURE_RESPONSE_FORMAT,
         temperature,
         maxTokens,
         undefined,
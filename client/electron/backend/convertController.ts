@@ -33,12 +33,24 @@ type ServiceError = Error & {
   details?: unknown;
 };
 
-let cachedFormats: { data: FormatsData; ts: number } | null = null;
+// Formats per converter endpoint; concurrent misses share one /formats request
+let cachedFormats: { base: string; data: FormatsData; ts: number } | null = null;
+let pendingFormats: { base: string; promise: Promise<FormatsData> } | null = null;
 const CACHE_TTL_MS = 10 * 60 * 1000; // 10 minutes
 const ARTICLE_FETCH_TIMEOUT_MS = 20000;
 const MAX_FILENAME_LENGTH = 120;
 
-const RESERVED_FILENAME_CHARS = new Set(["<", ">", ":", "\"", "/", "\\", "|", "?", "*"]);
+// Runs of control characters, whitespace and characters reserved in file
+// names; each run collapses to a single space in one regex pass
+// eslint-disable-next-line no-control-regex
+const FILENAME_UNSAFE_RUN_RE = new RegExp('[\\u0000-\\u001f\\s<>:"/\\\\|?*]+', "g");
+const HTML_ENTITIES: Record<string, string> = {
+  "&amp;": "&",
+  "&lt;": "<",
+  "&gt;": ">",
+  "&quot;": '"',
+  "&#39;": "'",
+};
 
 type HttpStatusError = Error & { statusCode?: number; statusMessage?: string; finalUrl?: string };
 
@@ -50,16 +62,7 @@ function sanitizeFileBaseName(raw: string, fallback: string): string {
   } catch {
     normalized = base;
   }
-  const filtered = Array.from(normalized)
-    .map((ch) => {
-      const code = ch.charCodeAt(0);
-      if (code < 32 || RESERVED_FILENAME_CHARS.has(ch)) {
-        return " ";
-      }
-      return ch;
-    })
-    .join("");
-  const compact = filtered.replace(/\s+/g, " ").trim();
+  const compact = normalized.replace(FILENAME_UNSAFE_RUN_RE, " ").trim();
   if (!compact) {
     return "article";
   }
@@ -72,14 +75,7 @@ function extractTitle(html: string): string {
   const match = html.match(/<title[^>]*>([\s\S]*?)<\/title>/i);
   if (!match) return "";
   const raw = match[1].replace(/\s+/g, " ").trim();
-  const entities: Record<string, string> = {
-    "&amp;": "&",
-    "&lt;": "<",
-    "&gt;": ">",
-    "&quot;": '"',
-    "&#39;": "'",
-  };
-  return raw.replace(/&[#a-zA-Z0-9]+;/g, (ent) => entities[ent] ?? ent);
+  return raw.replace(/&[#a-zA-Z0-9]+;/g, (ent) => HTML_ENTITIES[ent] ?? ent);
 }
 
 async function fetchWebpage(targetUrl: string): Promise<{ html: string; finalUrl: string; contentType: string; title: string }>
@@ -229,6 +225,37 @@ async function fetchWebpage(targetUrl: string): Promise<{ html: string; finalUrl
   });
 }
 
+/**
+ * First free name among `base.ext`, `base (1).ext` ... `base (maxSuffix).ext`
+ * in `dir`. The plain name is tried with a single access(); only when it is
+ * taken are the suffixed candidates checked against one directory listing,
+ * comparing case-insensitively to stay safe on Windows/macOS file systems
+ * (falling back to access() per candidate if the listing fails). When every
+ * candidate is taken the last one is returned.
+ */
+async function pickUniqueOutputPath(dir: string, baseName: string, ext: string, maxSuffix: number): Promise<string> {
+  const plain = path.join(dir, `${baseName}.${ext}`);
+  const plainTaken = await fsp.access(plain).then(() => true, () => false);
+  if (!plainTaken) return plain;
+  const entries = await fsp.readdir(dir).catch(() => null);
+  const taken = entries ? new Set(entries.map((entry) => entry.toLowerCase())) : null;
+  // Without a listing, probe each candidate with access() so nothing is overwritten
+  const isTaken = async (name: string): Promise<boolean> =>
+    taken ? taken.has(name.toLowerCase()) : fsp.access(path.join(dir, name)).then(() => true, () => false);
+  let name = `${baseName} (1).${ext}`;
+  for (let idx = 2; idx <= maxSuffix && (await isTaken(name)); idx += 1) {
+    name = `${baseName} (${idx}).${ext}`;
+  }
+  return path.join(dir, name);
+}
+
+// Output file extension for a requested target format (already lowercased)
+function normalizeOutputExt(fmt: string): string {
+  if (fmt === "md" || fmt === "markdown") return "md";
+  if (fmt === "htm") return "html";
+  return fmt;
+}
+
 function normalizeFormats(list: unknown): string[] {
   if (!Array.isArray(list)) return [];
   const seen = new Set<string>();
@@ -247,10 +274,6 @@ function normalizeFormats(list: unknown): string[] {
 }
 
 async function loadServiceFormats(): Promise<FormatsData> {
-  if (cachedFormats && Date.now() - cachedFormats.ts < CACHE_TTL_MS) {
-    return cachedFormats.data;
-  }
-
   const cfg = configManager.getConfig();
   const baseRaw = (cfg.fileConvertEndpoint || "").trim();
   if (!baseRaw) {
@@ -265,6 +288,25 @@ async function loadServiceFormats(): Promise<FormatsData> {
     throw err;
   }
 
+  if (cachedFormats && cachedFormats.base === base && Date.now() - cachedFormats.ts < CACHE_TTL_MS) {
+    return cachedFormats.data;
+  }
+  if (pendingFormats && pendingFormats.base === base) {
+    return pendingFormats.promise;
+  }
+
+  const promise = fetchServiceFormats(base);
+  pendingFormats = { base, promise };
+  try {
+    const data = await promise;
+    cachedFormats = { base, data, ts: Date.now() };
+    return data;
+  } finally {
+    if (pendingFormats?.promise === promise) pendingFormats = null;
+  }
+}
+
+async function fetchServiceFormats(base: string): Promise<FormatsData> {
   const resp = await httpGetJson<ServiceFormatsResponse>(`${base}/formats`, undefined, 20000);
   if (!resp.ok || !resp.data) {
     const err: ServiceError = new Error(resp.error?.message || `fetch_failed_${resp.status}`);
@@ -288,7 +330,6 @@ async function loadServiceFormats(): Promise<FormatsData> {
   pandoc_available: outputs.length > 0,
     markitdown_available: outputs.some((fmt) => fmt === "md" || fmt === "markdown"),
   };
-  cachedFormats = { data, ts: Date.now() };
   return data;
 }
 
@@ -376,8 +417,11 @@ export function registerConversionRoutes(appExp: Express): void {
         return;
       }
 
+      // The temp dir fallback is already ensured; only a caller-supplied directory needs creating
       const destinationDir = outputDirInput ? path.resolve(outputDirInput) : await ensureTempDir();
-      await fsp.mkdir(destinationDir, { recursive: true });
+      if (outputDirInput) {
+        await fsp.mkdir(destinationDir, { recursive: true });
+      }
 
       let fetchResult;
       try {
@@ -437,18 +481,9 @@ export function registerConversionRoutes(appExp: Express): void {
       }
 
       const baseName = sanitizeFileBaseName(fileNameInput || title, normalizedUrl.hostname || "article");
-      const buildOutPath = (suffix?: string) => path.join(destinationDir, `${baseName}${suffix ? ` ${suffix}` : ""}.html`);
-      let outPath = buildOutPath();
-      if (!overwrite) {
-        for (let idx = 1; idx <= 1000; idx += 1) {
-          const exists = await fsp
-            .access(outPath)
-            .then(() => true)
-            .catch(() => false);
-          if (!exists) break;
-          outPath = buildOutPath(`(${idx})`);
-        }
-      }
+      const outPath = overwrite
+        ? path.join(destinationDir, `${baseName}.html`)
+        : await pickUniqueOutputPath(destinationDir, baseName, "html", 1000);
 
       await fsp.writeFile(outPath, html, "utf8");
       const size = Buffer.byteLength(html, "utf8");
@@ -550,36 +585,23 @@ export function registerConversionRoutes(appExp: Express): void {
       }
 
       const srcDir = path.dirname(filePath);
-      const baseName = path.basename(filePath, path.extname(filePath));
+      const srcExtWithDot = path.extname(filePath);
+      const baseName = path.basename(filePath, srcExtWithDot);
+      const srcExt = srcExtWithDot.slice(1).toLowerCase() || "txt";
       const outDir = outputDirInput && outputDirInput.trim() ? path.resolve(outputDirInput.trim()) : srcDir;
-      await fsp.mkdir(outDir, { recursive: true }).catch(() => void 0);
-
-      // Helper for deciding extension normalization
-      const normExt = (fmt: string) => {
-        const f = fmt.toLowerCase();
-        if (f === "md" || f === "markdown") return "md";
-        if (f === "htm") return "html";
-        return f;
-      };
-      const outExt = normExt(targetFormat);
-      const buildOutPath = (suffix?: string) => path.join(outDir, `${baseName}${suffix ? ` ${suffix}` : ""}.${outExt}`);
+      // srcDir exists: the source file inside it was stat'ed above
+      if (outDir !== srcDir) {
+        await fsp.mkdir(outDir, { recursive: true }).catch(() => void 0);
+      }
 
+      const outExt = normalizeOutputExt(targetFormat);
       // ensure unique path if not overwriting
-      let outPath = buildOutPath();
-      if (!overwrite) {
-        for (let idx = 1; idx <= 2000; idx += 1) {
-          const exists = await fsp
-            .access(outPath)
-            .then(() => true)
-            .catch(() => false);
-          if (!exists) break;
-          outPath = buildOutPath(`(${idx})`);
-        }
-      }
+      const outPath = overwrite
+        ? path.join(outDir, `${baseName}.${outExt}`)
+        : await pickUniqueOutputPath(outDir, baseName, outExt, 2000);
 
       let finalOut = "";
       try {
-        const srcExt = path.extname(filePath).replace(/^\./, "").toLowerCase() || "txt";
         const tempResultPath = await convertFileViaService(filePath, srcExt, targetFormat);
         await fsp.copyFile(tempResultPath, outPath);
         finalOut = outPath;
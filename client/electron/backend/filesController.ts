@@ -5,10 +5,10 @@ import { logger } from "../logger";
 import path from "path";
 import fs from "fs";
 import { promises as fsp } from "fs";
-import { MAX_TEXT_PREVIEW_BYTES, getMimeByExt, isImageExt, isVideoExt, decodeTextBuffer, CATEGORY_EXTENSIONS, toNumber, isNonEmptyString, parseTags } from "./utils/fileHelpers";
+import { MAX_TEXT_PREVIEW_BYTES, getMimeByExt, isImageExt, isVideoExt, decodeTextBuffer, CATEGORY_EXTENSIONS, getCategoryByExt, toNumber, isNonEmptyString, parseTags, toTrimmedStrings } from "./utils/fileHelpers";
 import { ensureTxtFile, chunkText } from "./utils/fileConversion";
 import { ensureTempDir } from "./utils/pathHelper";
-import { embedText, generateStructuredJson, describeImage, getActiveModelName } from "./utils/llm";
+import { embedTextToMatrix, generateStructuredJson, describeImage, getActiveModelName } from "./utils/llm";
 import type { LlmMessage } from "./utils/llm";
 import type { StructuredResponseFormat } from "./utils/ollama";
 import { buildVisionDescribePrompt, normalizeLanguage } from "./utils/promptHelper";
@@ -25,6 +25,7 @@ import { configManager } from "../configManager";
 import type { AppConfig } from "../configManager";
 import { i18n } from "../languageHelper";
 import { extractVideoScreenshots } from "./utils/videoCapture";
+import { mapWithConcurrency } from "./utils/concurrency";
 
 function getTextConversionFailedMessage(): string {
   return i18n.t("backend.files.errors.textConversionFailed", "Failed to convert file to text");
@@ -32,6 +33,56 @@ function getTextConversionFailedMessage(): string {
 
 const HTML_PREVIEW_EXTENSIONS = new Set(["html", "htm", "xhtml"]);
 
+const EXTRACT_TAGS_RESPONSE_FORMAT: StructuredResponseFormat = {
+  json_schema: {
+    name: "extract_tags_schema",
+    schema: {
+      type: "object",
+      properties: {
+        tags: { type: "array", items: { type: "string" } },
+      },
+      required: ["tags"],
+      additionalProperties: false,
+    },
+    strict: true,
+  },
+} as const;
+
+const OPTIMIZE_TAGS_RESPONSE_FORMAT: StructuredResponseFormat = {
+  json_schema: {
+    name: "optimize_tags_schema",
+    schema: {
+      type: "object",
+      properties: {
+        optimized_tags: { type: "array", items: { type: "string" } },
+      },
+      required: ["optimized_tags"],
+      additionalProperties: false,
+    },
+    strict: true,
+  },
+} as const;
+
+const RECOMMEND_DIRECTORY_RESPONSE_FORMAT = {
+  json_schema: {
+    name: "recommend_directory_schema",
+    schema: {
+      type: "object",
+      properties: {
+        recommended_directory: { type: "string" },
+        confidence: { type: "number" },
+        reasoning: { type: "string" },
+        alternatives: { type: "array", items: { type: "string" } },
+      },
+      required: ["recommended_directory", "confidence", "reasoning", "alternatives"],
+    },
+    strict: true,
+  },
+} as const;
+
+// Max video screenshots described by the vision model at once
+const VIDEO_DESCRIBE_CONCURRENCY = 3;
+
 async function summarizeVideoContent(
   videoPath: string,
   language: SupportedLang,
@@ -48,11 +99,11 @@ async function summarizeVideoContent(
   try {
     const shots = await extractVideoScreenshots(videoPath, captureOptions);
     const visionPrompt = buildVisionDescribePrompt(language);
-    const descriptions: string[] = [];
     const configSizeLimit = Math.max(captureOptions.targetWidth ?? 0, captureOptions.targetHeight ?? 0);
     const maxDescribeDimension = configSizeLimit > 0 ? Math.min(configSizeLimit, 512) : 512;
 
-    for (const shot of shots) {
+    // Describe frames concurrently; results keep the screenshot order
+    const described = await mapWithConcurrency(shots, VIDEO_DESCRIBE_CONCURRENCY, async (shot) => {
       try {
         let base64: string | null = null;
         try {
@@ -92,14 +143,15 @@ async function summarizeVideoContent(
           base64 = imgBuf.toString("base64");
         }
         const desc = await describeImage(base64, { prompt: visionPrompt });
-        if (desc && desc.trim()) {
-          descriptions.push(`[t=${shot.timeSec.toFixed(1)}s] ${desc.trim()}`);
-        }
         logger.info("summarizeVideoContent: described screenshot", { file: shot.filePath, timeSec: shot.timeSec, desc });
+        const trimmed = desc ? desc.trim() : "";
+        return trimmed ? `[t=${shot.timeSec.toFixed(1)}s] ${trimmed}` : null;
       } catch (e) {
         logger.warn("summarizeVideoContent: describe screenshot failed", { frame: shot.filePath, err: String(e) });
+        return null;
       }
-    }
+    });
+    const descriptions = described.filter((d): d is string => d !== null);
 
     if (descriptions.length > 0) {
       return { summary: descriptions.join("\n") };
@@ -122,6 +174,15 @@ interface ListFilesRequestBody {
 
 // moved helpers to utils/fileHelpers
 
+// Whitespace-separated word count without building a split array
+const WORD_RE = /\S+/g;
+function countWords(text: string): number {
+  let count = 0;
+  WORD_RE.lastIndex = 0;
+  while (WORD_RE.exec(text) !== null) count += 1;
+  return count;
+}
+
 export async function listFilesHandler(req: Request, res: Response): Promise<void> {
   try {
     const body = req.body as ListFilesRequestBody | undefined;
@@ -383,15 +444,7 @@ export async function updateFileHandler(req: Request, res: Response): Promise<vo
       category = newCategoryRaw;
     } else if (targetName !== row.name) {
       // Infer when name changed (might change extension)
-      let inferred = "other";
-      for (const [cat, exts] of Object.entries(CATEGORY_EXTENSIONS)) {
-        if (cat === "other") continue;
-        if (exts.includes(ext)) {
-          inferred = cat;
-          break;
-        }
-      }
-      category = inferred;
+      category = getCategoryByExt(ext);
     }
 
     // Build DB update
@@ -1180,7 +1233,7 @@ export async function importToRagHandler(req: Request, res: Response): Promise<v
 
     const ext = path.extname(filePath).replace(/^\./, "").toLowerCase();
     const isImage = isImageExt(ext);
-    const isVideo = (CATEGORY_EXTENSIONS.video || []).includes(ext);
+    const isVideo = getCategoryByExt(ext) === "video";
     const existingSummary = typeof recordWithSummary.summary === "string" ? recordWithSummary.summary.trim() : "";
 
     let txtPath: string | null = null;
@@ -1256,11 +1309,11 @@ export async function importToRagHandler(req: Request, res: Response): Promise<v
       }
       content = await fsp.readFile(txtPath, "utf8");
     }
-    // 2) chunk
-    const chunks = chunkText(content, chunkSize, overlap);
+    // 2) chunk (whitespace-only content yields no chunks and no embedding call)
+    const chunks = isNonEmptyString(content) ? chunkText(content, chunkSize, overlap) : [];
     // 3) embed via active provider
-    const embeddings = await embedText(chunks, model);
-    if (embeddings.length !== chunks.length) {
+    const { matrix: embeddings, dim: embeddingDim } = await embedTextToMatrix(chunks, model);
+    if (embeddings.length !== chunks.length * embeddingDim) {
       throw new Error("Embeddings count does not match chunks count");
     }
 
@@ -1282,7 +1335,7 @@ export async function importToRagHandler(req: Request, res: Response): Promise<v
       content: c,
       content_type: "text",
       char_count: c.length,
-      token_count: c.split(/\s+/).filter(Boolean).length,
+      token_count: countWords(c),
       embedding_id: `${fileId}_chunk_${i}`,
       start_pos: null as number | null,
       end_pos: null as number | null,
@@ -1309,7 +1362,7 @@ export async function importToRagHandler(req: Request, res: Response): Promise<v
     // 5) Update global FAISS index using chunk IDs as vector IDs
     try {
       // Remove stale vectors by previous chunk row ids, then add fresh ones
-      await updateGlobalFaissIndex({ addIds: chunkIds, vectors: embeddings, removeIds: prevChunkIds });
+      await updateGlobalFaissIndex({ addIds: chunkIds, matrix: embeddings, dim: embeddingDim, removeIds: prevChunkIds });
     } catch (e) {
       logger.error("Failed to update global FAISS index", e as unknown);
     }
@@ -1322,8 +1375,8 @@ export async function importToRagHandler(req: Request, res: Response): Promise<v
         file_path: filePath,
         txt_path: txtPath,
         chunk_count: chunks.length,
-        embedding_count: embeddings.length,
-        dims: embeddings[0]?.length ?? 0,
+        embedding_count: chunks.length,
+        dims: embeddingDim,
         used_content_source: usedContentSource,
       },
       error: null,
@@ -1424,7 +1477,7 @@ export async function deleteFileHandler(req: Request, res: Response): Promise<vo
     if (chunks.length > 0) {
       const removeIds = chunks.map((c) => c.id);
       try {
-        await updateGlobalFaissIndex({ addIds: [], vectors: [], removeIds });
+        await updateGlobalFaissIndex({ addIds: [], removeIds });
       } catch (e) {
         logger.warn("Failed to remove chunk vectors from FAISS index during delete", e as unknown);
         // proceed even if vector removal fails
@@ -1517,14 +1570,7 @@ export async function stageFileHandler(req: Request, res: Response): Promise<voi
     const originalName = path.basename(source);
     const ext = path.extname(originalName).replace(/^\./, "").toLowerCase();
     const mime = getMimeByExt(ext);
-    let category = "other";
-    for (const [cat, exts] of Object.entries(CATEGORY_EXTENSIONS)) {
-      if (cat === "other") continue;
-      if (exts.includes(ext)) {
-        category = cat;
-        break;
-      }
-    }
+    const category = getCategoryByExt(ext);
 
     const uniquePrefix = `${Date.now()}_${randomUUID().slice(0, 8)}`;
     const stagedFileName = `${uniquePrefix}_${originalName}`;
@@ -1809,14 +1855,7 @@ export async function saveFileHandler(req: Request, res: Response): Promise<void
 
     const finalExt = path.extname(destFileName).replace(/^\./, "").toLowerCase();
     const mime = getMimeByExt(finalExt);
-    let category = "other";
-    for (const [cat, exts] of Object.entries(CATEGORY_EXTENSIONS)) {
-      if (cat === "other") continue;
-      if (exts.includes(finalExt)) {
-        category = cat;
-        break;
-      }
-    }
+    const category = getCategoryByExt(finalExt);
 
     const nowIso = new Date().toISOString();
     let effectiveFileId = fileIdInput;
@@ -1910,32 +1949,16 @@ export async function saveFileHandler(req: Request, res: Response): Promise<void
         const extractTagsFromText = async (text: string): Promise<string[]> => {
           const snippet = text.length > 5000 ? text.slice(0, 5000) : text;
           const messages: LlmMessage[] = buildExtractTagsMessages({ language, text: snippet, topK: tagTopK, domainHint: "" });
-          const responseFormat: StructuredResponseFormat = {
-            json_schema: {
-              name: "extract_tags_schema",
-              schema: {
-                type: "object",
-                properties: {
-                  tags: { type: "array", items: { type: "string" } },
-                },
-                required: ["tags"],
-                additionalProperties: false,
-              },
-              strict: true,
-            },
-          } as const;
           let result: unknown = {};
           try {
-            result = await generateStructuredJson(messages, responseFormat, 0.2, 800, "", language);
+            result = await generateStructuredJson(messages, EXTRACT_TAGS_RESPONSE_FORMAT, 0.2, 800, "", language);
           } catch (e) {
             logger.warn("Auto-tag generateStructuredJson failed", e as unknown);
             return [];
           }
           const obj = (result || {}) as Record<string, unknown>;
           const tags = Array.isArray(obj.tags)
-            ? (obj.tags as unknown[])
-                .filter((t: unknown): t is string => typeof t === "string" && t.trim().length > 0)
-                .map((t) => t.trim())
+            ? toTrimmedStrings(obj.tags as unknown[])
             : [];
           return tags;
         };
@@ -2028,28 +2051,11 @@ export async function saveFileHandler(req: Request, res: Response): Promise<void
             },
           ];
 
-          const responseFormat: StructuredResponseFormat = {
-            json_schema: {
-              name: "optimize_tags_schema",
-              schema: {
-                type: "object",
-                properties: {
-                  optimized_tags: { type: "array", items: { type: "string" } },
-                },
-                required: ["optimized_tags"],
-                additionalProperties: false,
-              },
-              strict: true,
-            },
-          } as const;
-
           try {
-            const result = await generateStructuredJson(messages, responseFormat, 0.2, 800, "", language);
+            const result = await generateStructuredJson(messages, OPTIMIZE_TAGS_RESPONSE_FORMAT, 0.2, 800, "", language);
             const obj = (result || {}) as Record<string, unknown>;
             const optimizedTags = Array.isArray(obj.optimized_tags)
-              ? (obj.optimized_tags as unknown[])
-                  .filter((t: unknown): t is string => typeof t === "string" && t.trim().length > 0)
-                  .map((t) => t.trim())
+              ? toTrimmedStrings(obj.optimized_tags as unknown[])
               : autoTags;
 
             // Use optimized tags if successful
@@ -2174,7 +2180,7 @@ export async function recommendDirectoryHandler(req: Request, res: Response): Pr
 
     const filename = path.basename(filePath);
     const ext = path.extname(filePath).replace(/^\./, "").toLowerCase();
-    const isVideo = (CATEGORY_EXTENSIONS.video || []).includes(ext);
+    const isVideo = getCategoryByExt(ext) === "video";
 
     // Convert to text for analysis unless content is provided
     let txtPath: string | null = null;
@@ -2226,26 +2232,9 @@ export async function recommendDirectoryHandler(req: Request, res: Response): Pr
       },
     ];
 
-    const responseFormat = {
-      json_schema: {
-        name: "recommend_directory_schema",
-        schema: {
-          type: "object",
-          properties: {
-            recommended_directory: { type: "string" },
-            confidence: { type: "number" },
-            reasoning: { type: "string" },
-            alternatives: { type: "array", items: { type: "string" } },
-          },
-          required: ["recommended_directory", "confidence", "reasoning", "alternatives"],
-        },
-        strict: true,
-      },
-    } as const;
-
     let result: unknown;
     try {
-      result = await generateStructuredJson(messages, responseFormat, 0.7, 1000, "", undefined, provider);
+      result = await generateStructuredJson(messages, RECOMMEND_DIRECTORY_RESPONSE_FORMAT, 0.7, 1000, "", undefined, provider);
     } catch (err) {
       logger.error("LLM recommend-directory call failed", err as unknown);
       res.status(500).json({
@@ -2608,24 +2597,10 @@ export async function extractTagsHandler(req: Request, res: Response): Promise<v
 
     const snippet = text.length > 5000 ? text.slice(0, 5000) : text;
     const messages: LlmMessage[] = buildExtractTagsMessages({ language, text: snippet, topK, domainHint });
-    const responseFormat: StructuredResponseFormat = {
-      json_schema: {
-        name: "extract_tags_schema",
-        schema: {
-          type: "object",
-          properties: {
-            tags: { type: "array", items: { type: "string" } },
-          },
-          required: ["tags"],
-          additionalProperties: false,
-        },
-        strict: true,
-      },
-    } as const;
 
     let result: unknown;
     try {
-  result = await generateStructuredJson(messages, responseFormat, 0.2, 800, "", language, provider);
+  result = await generateStructuredJson(messages, EXTRACT_TAGS_RESPONSE_FORMAT, 0.2, 800, "", language, provider);
     } catch (e) {
       logger.error("/api/files/extract-tags LLM failed", e as unknown);
       res.status(500).json({
@@ -2641,9 +2616,7 @@ export async function extractTagsHandler(req: Request, res: Response): Promise<v
 
     const obj = (result || {}) as Record<string, unknown>;
     const tags = Array.isArray(obj.tags)
-      ? (obj.tags as unknown[])
-          .filter((t: unknown): t is string => typeof t === "string" && t.trim().length > 0)
-          .map((t) => t.trim())
+      ? toTrimmedStrings(obj.tags as unknown[])
       : [];
 
     res.status(200).json({
@@ -2743,9 +2716,7 @@ export async function updateFileTagsHandler(req: Request, res: Response): Promis
       try {
         const parsed = JSON.parse(row.tags) as unknown;
         if (Array.isArray(parsed)) {
-          return parsed
-            .filter((t): t is string => typeof t === "string" && t.trim().length > 0)
-            .map((t) => t.trim());
+          return toTrimmedStrings(parsed);
         }
       } catch (e) {
         logger.warn("updateFileTagsHandler: failed to parse existing tags", { file_id: rawFileId, err: String(e) });
@@ -2874,24 +2845,10 @@ export async function updateFileTagsHandler(req: Request, res: Response): Promis
 
     const promptSnippet = snippet.length > 5000 ? snippet.slice(0, 5000) : snippet;
     const messages: LlmMessage[] = buildExtractTagsMessages({ language, text: promptSnippet, topK, domainHint });
-    const responseFormat: StructuredResponseFormat = {
-      json_schema: {
-        name: "extract_tags_schema",
-        schema: {
-          type: "object",
-          properties: {
-            tags: { type: "array", items: { type: "string" } },
-          },
-          required: ["tags"],
-          additionalProperties: false,
-        },
-        strict: true,
-      },
-    } as const;
 
     let result: unknown;
     try {
-      result = await generateStructuredJson(messages, responseFormat, 0.2, 800, "", language, provider);
+      result = await generateStructuredJson(messages, EXTRACT_TAGS_RESPONSE_FORMAT, 0.2, 800, "", language, provider);
     } catch (e) {
       logger.error("/api/files/update-tags LLM failed", e as unknown);
       res.status(500).json({
@@ -2907,9 +2864,7 @@ export async function updateFileTagsHandler(req: Request, res: Response): Promis
 
     const obj = (result || {}) as Record<string, unknown>;
     const tags = Array.isArray(obj.tags)
-      ? (obj.tags as unknown[])
-          .filter((t: unknown): t is string => typeof t === "string" && t.trim().length > 0)
-          .map((t) => t.trim())
+      ? toTrimmedStrings(obj.tags as unknown[])
       : [];
 
     if (tags.length === 0) {
@@ -1,6 +1,5 @@
 import type { Request, Response, Express } from "express";
 import type { Transaction } from "sequelize";
-import fs from "fs";
 import { promises as fsp } from "fs";
 import { logger } from "../logger";
 import { getSequelize } from "./db";
@@ -20,6 +19,24 @@ interface ModelsResponse {
   embedModels: ModelInfo[];
 }
 
+// Model capability keyword routing, compiled once at module load so each
+// model id is classified with a single regex scan instead of chained
+// lowercase + includes() calls.
+const OLLAMA_VISION_RE = /vl|vision|llava/i;
+const OLLAMA_EMBED_RE = /embed|bge|nomic/i;
+const OPENAI_CHAT_RE = /^gpt-|turbo|o1-|o3-/;
+const OPENAI_VISION_RE = /vision|4o|o1/;
+const OPENAI_EMBED_RE = /embed/;
+const OPENROUTER_VISION_RE = /vision|vl|4o|gemini/i;
+const BAILIAN_CHAT_RE = /qwen|turbo|plus/;
+const BAILIAN_VISION_RE = /vl/;
+const BAILIAN_EMBED_RE = /embedding/;
+const PEGA_VISION_RE = /vl|vision/i;
+const PEGA_EMBED_RE = /embed|bge/i;
+
+const filterModelsByPattern = (models: ModelInfo[], pattern: RegExp): ModelInfo[] =>
+  models.filter((m) => pattern.test(m.id));
+
 // Type guard helpers for API response validation
 interface OllamaModelsData {
   models?: Array<{ name: string; details?: { family?: string } }>;
@@ -160,17 +177,9 @@ const listProviderModels = async (req: Request, res: Response) => {
               // All models in Ollama can potentially be used for chat
               chatModels = models;
               // Vision models typically have 'vl' or 'vision' in their name
-              visionModels = models.filter((m) => 
-                m.id.toLowerCase().includes('vl') || 
-                m.id.toLowerCase().includes('vision') ||
-                m.id.toLowerCase().includes('llava')
-              );
+              visionModels = filterModelsByPattern(models, OLLAMA_VISION_RE);
               // Embedding models typically have 'embed' or 'bge' in their name
-              embedModels = models.filter((m) => 
-                m.id.toLowerCase().includes('embed') || 
-                m.id.toLowerCase().includes('bge') ||
-                m.id.toLowerCase().includes('nomic')
-              );
+              embedModels = filterModelsByPattern(models, OLLAMA_EMBED_RE);
             }
           }
         } catch (e) {
@@ -198,23 +207,11 @@ const listProviderModels = async (req: Request, res: Response) => {
               if (isOpenAIModelsData(rawData) && Array.isArray(rawData.data)) {
                 models = rawData.data.map((m) => ({ id: m.id, name: m.id }));
                 // Chat models (gpt-*)
-                chatModels = models.filter((m) => 
-                  m.id.startsWith('gpt-') || 
-                  m.id.includes('turbo') ||
-                  m.id.includes('o1-') ||
-                  m.id.includes('o3-')
-                );
+                chatModels = filterModelsByPattern(models, OPENAI_CHAT_RE);
                 // Vision models (gpt-4o, gpt-4-vision, etc.)
-                visionModels = models.filter((m) => 
-                  m.id.includes('vision') || 
-                  m.id.includes('4o') ||
-                  m.id.includes('o1')
-                );
+                visionModels = filterModelsByPattern(models, OPENAI_VISION_RE);
                 // Embedding models
-                embedModels = models.filter((m) => 
-                  m.id.includes('embedding') || 
-                  m.id.includes('embed')
-                );
+                embedModels = filterModelsByPattern(models, OPENAI_EMBED_RE);
               }
             }
           } catch (e) {
@@ -244,12 +241,7 @@ const listProviderModels = async (req: Request, res: Response) => {
               // All OpenRouter models can be used for chat
               chatModels = models;
               // Vision models
-              visionModels = models.filter((m) => 
-                m.id.toLowerCase().includes('vision') || 
-                m.id.toLowerCase().includes('vl') ||
-                m.id.toLowerCase().includes('4o') ||
-                m.id.toLowerCase().includes('gemini')
-              );
+              visionModels = filterModelsByPattern(models, OPENROUTER_VISION_RE);
             }
           }
 
@@ -287,17 +279,9 @@ const listProviderModels = async (req: Request, res: Response) => {
               const rawData: unknown = await response.json();
               if (isOpenAIModelsData(rawData) && Array.isArray(rawData.data)) {
                 models = rawData.data.map((m) => ({ id: m.id, name: m.id }));
-                chatModels = models.filter((m) => 
-                  m.id.includes('qwen') || 
-                  m.id.includes('turbo') ||
-                  m.id.includes('plus')
-                );
-                visionModels = models.filter((m) => 
-                  m.id.includes('vl')
-                );
-                embedModels = models.filter((m) => 
-                  m.id.includes('embedding')
-                );
+                chatModels = filterModelsByPattern(models, BAILIAN_CHAT_RE);
+                visionModels = filterModelsByPattern(models, BAILIAN_VISION_RE);
+                embedModels = filterModelsByPattern(models, BAILIAN_EMBED_RE);
               }
             }
           } catch (e) {
@@ -350,14 +334,8 @@ const listProviderModels = async (req: Request, res: Response) => {
               }
               
               chatModels = models;
-              visionModels = models.filter((m) => 
-                m.id.toLowerCase().includes('vl') || 
-                m.id.toLowerCase().includes('vision')
-              );
-              embedModels = models.filter((m) => 
-                m.id.toLowerCase().includes('embed') || 
-                m.id.toLowerCase().includes('bge')
-              );
+              visionModels = filterModelsByPattern(models, PEGA_VISION_RE);
+              embedModels = filterModelsByPattern(models, PEGA_EMBED_RE);
             }
           }
         } catch (e) {
@@ -454,7 +432,6 @@ const clearData = async (_req: Request, res: Response) => {
     // 2) Remove FAISS vector index file if it exists
     const vectorDbPath = getGlobalIndexPath();
     try {
-      await fsp.access(vectorDbPath, fs.constants.F_OK);
       await fsp.unlink(vectorDbPath);
       logger.info(`Deleted FAISS index file: ${vectorDbPath}`);
     } catch {
@@ -5,10 +5,26 @@ import { generateStructuredJson } from "./utils/llm";
 import type { LlmMessage } from "./utils/llm";
 import type { StructuredResponseFormat } from "./utils/ollama";
 import { normalizeLanguage } from "./utils/promptHelper";
+import { toTrimmedStrings } from "./utils/fileHelpers";
 import type { SupportedLang } from "./utils/promptHelper";
 import { configManager } from "../configManager";
 import type { ProviderName } from "./utils/llm";
 
+const OPTIMIZE_TAGS_RESPONSE_FORMAT: StructuredResponseFormat = {
+  json_schema: {
+    name: "optimize_tags_schema",
+    schema: {
+      type: "object",
+      properties: {
+        optimized_tags: { type: "array", items: { type: "string" } },
+      },
+      required: ["optimized_tags"],
+      additionalProperties: false,
+    },
+    strict: true,
+  },
+} as const;
+
 /**
  * List all system tags
  */
@@ -50,9 +66,7 @@ export async function saveSystemTagsHandler(req: Request, res: Response): Promis
   try {
     const body = req.body as { tags?: unknown } | undefined;
     const tags = Array.isArray(body?.tags)
-      ? (body.tags as unknown[])
-          .filter((t: unknown): t is string => typeof t === "string" && t.trim().length > 0)
-          .map((t) => t.trim())
+      ? toTrimmedStrings(body.tags as unknown[])
       : [];
 
     // Remove duplicates
@@ -150,9 +164,7 @@ export async function optimizeTagsHandler(req: Request, res: Response): Promise<
     const body = req.body as { tags?: unknown; language?: unknown; provider?: unknown } | undefined;
     
     const inputTags = Array.isArray(body?.tags)
-      ? (body.tags as unknown[])
-          .filter((t: unknown): t is string => typeof t === "string" && t.trim().length > 0)
-          .map((t) => t.trim())
+      ? toTrimmedStrings(body.tags as unknown[])
       : [];
 
     if (inputTags.length === 0) {
@@ -213,24 +225,9 @@ export async function optimizeTagsHandler(req: Request, res: Response): Promise<
       systemTags,
     });
 
-    const responseFormat: StructuredResponseFormat = {
-      json_schema: {
-        name: "optimize_tags_schema",
-        schema: {
-          type: "object",
-          properties: {
-            optimized_tags: { type: "array", items: { type: "string" } },
-          },
-          required: ["optimized_tags"],
-          additionalProperties: false,
-        },
-        strict: true,
-      },
-    } as const;
-
     let result: unknown;
     try {
-      result = await generateStructuredJson(messages, responseFormat, 0.2, 800, "", language, provider);
+      result = await generateStructuredJson(messages, OPTIMIZE_TAGS_RESPONSE_FORMAT, 0.2, 800, "", language, provider);
     } catch (e) {
       logger.error("/api/tags/optimize LLM failed", e as unknown);
       // Fallback: return input tags on LLM error
@@ -252,9 +249,7 @@ export async function optimizeTagsHandler(req: Request, res: Response): Promise<
 
     const obj = (result || {}) as Record<string, unknown>;
     const optimizedTags = Array.isArray(obj.optimized_tags)
-      ? (obj.optimized_tags as unknown[])
-          .filter((t: unknown): t is string => typeof t === "string" && t.trim().length > 0)
-          .map((t) => t.trim())
+      ? toTrimmedStrings(obj.optimized_tags as unknown[])
       : inputTags;
 
     // Remove duplicates
@@ -13,7 +13,7 @@ import type {
   GenerateStructuredJsonParams,
   DescribeImageOptions,
 } from "./llmProviderTypes";
-import { MIN_JSON_COMPLETION_TOKENS } from "./llmProviderTypes";
+import { MIN_JSON_COMPLETION_TOKENS, JSON_BLOCK_RE } from "./llmProviderTypes";
 import type { ChatCompletionMessageParam } from "openai/resources/chat/completions";
 
 export interface BailianResolvedConfig extends ProviderResolvedConfig {
@@ -79,6 +79,8 @@ interface BailianEmbeddingResponse {
 }
 
 const DEFAULT_BASE_URL = "https://dashscope.aliyuncs.com/compatible-mode/v1";
+// Retries for 429/5xx from DashScope; backoff honors Retry-After
+const BAILIAN_MAX_RETRIES = 3;
 
 export class BailianProvider extends BaseLLMProvider {
   protected readonly providerLabel = "Bailian";
@@ -131,7 +133,8 @@ export class BailianProvider extends BaseLLMProvider {
       { model, input: inputs },
       { Accept: "application/json" },
       60000,
-      config.apiKey
+      config.apiKey,
+      BAILIAN_MAX_RETRIES
     );
 
     if (!resp.ok || !resp.data) {
@@ -192,7 +195,8 @@ export class BailianProvider extends BaseLLMProvider {
       requestBody,
       { Accept: "application/json" },
       60000,
-      config.apiKey
+      config.apiKey,
+      BAILIAN_MAX_RETRIES
     );
 
     if (!resp.ok || !resp.data) {
@@ -211,7 +215,7 @@ export class BailianProvider extends BaseLLMProvider {
     try {
       return JSON.parse(content);
     } catch (err) {
-      const match = content.match(/\{[\s\S]*\}|\[[\s\S]*\]/);
+      const match = content.match(JSON_BLOCK_RE);
       if (match) {
         return JSON.parse(match[0]);
       }
@@ -254,7 +258,8 @@ export class BailianProvider extends BaseLLMProvider {
       requestBody,
       { Accept: "application/json" },
       options?.timeoutMs ?? 120000,
-      config.apiKey
+      config.apiKey,
+      BAILIAN_MAX_RETRIES
     );
 
     if (!resp.ok || !resp.data) {
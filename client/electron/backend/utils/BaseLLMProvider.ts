@@ -4,6 +4,7 @@
  * logging, API request scheduling, response parsing, and error handling
  */
 
+import { configManager } from "../../configManager";
 import type { AppConfig } from "../../configManager";
 import { logger } from "../../logger";
 import type {
@@ -59,6 +60,14 @@ export abstract class BaseLLMProvider {
    */
   public abstract checkServiceHealth(): Promise<boolean>;
 
+  /**
+   * Model name embed() will send for the current config; used to key cached vectors
+   */
+  public resolveEmbedModel(overrideModel?: string): string {
+    const config = this.resolveConfig(configManager.getConfig());
+    return overrideModel || config.embedModel || this.getDefaultEmbedModel();
+  }
+
   /**
    * Validate inputs are non-empty
    */
@@ -103,65 +112,7 @@ export abstract class BaseLLMProvider {
    * Required for providers like OpenAI/OpenRouter with strict mode
    */
   protected normalizeJsonSchema<T>(input: T): T {
-    const seen = new WeakSet<object>();
-    
-    function walk(node: unknown): unknown {
-      if (!node || typeof node !== "object") return node;
-      if (seen.has(node as object)) return node;
-      seen.add(node as object);
-
-      const n = node as Record<string, unknown>;
-      const typeVal = typeof n.type === "string" ? String(n.type).toLowerCase() : undefined;
-
-      if (typeVal === "object") {
-        if (!Object.prototype.hasOwnProperty.call(n, "additionalProperties")) {
-          (n as Record<string, unknown>).additionalProperties = false;
-        }
-        if (n.properties && typeof n.properties === "object") {
-          const props = n.properties as Record<string, unknown>;
-          for (const key of Object.keys(props)) {
-            props[key] = walk(props[key]);
-          }
-        }
-        if (n.patternProperties && typeof n.patternProperties === "object") {
-          const pprops = n.patternProperties as Record<string, unknown>;
-          for (const key of Object.keys(pprops)) {
-            pprops[key] = walk(pprops[key]);
-          }
-        }
-      }
-
-      if (typeVal === "array") {
-        if (n.items) (n as Record<string, unknown>).items = walk(n.items);
-      }
-
-      for (const k of ["allOf", "anyOf", "oneOf", "not", "if", "then", "else"]) {
-        const v = n[k as keyof typeof n];
-        if (v) {
-          if (Array.isArray(v)) (n as Record<string, unknown>)[k] = v.map((s) => walk(s));
-          else (n as Record<string, unknown>)[k] = walk(v);
-        }
-      }
-      
-      for (const k of ["definitions", "$defs"]) {
-        const v = n[k as keyof typeof n];
-        if (v && typeof v === "object") {
-          const defs = v as Record<string, unknown>;
-          for (const key of Object.keys(defs)) {
-            defs[key] = walk(defs[key]);
-          }
-        }
-      }
-      
-      return n;
-    }
-
-    try {
-      const clone = JSON.parse(JSON.stringify(input)) as unknown;
-      return walk(clone) as T;
-    } catch {
-      return input;
-    }
+    return normalizeJsonSchema(input);
   }
 
   /**
@@ -259,11 +210,20 @@ export abstract class BaseLLMProvider {
   }
 }
 
+// Normalized copies keyed by the caller's schema object. Response schemas are
+// long-lived constants, so repeat calls skip the clone-and-walk entirely.
+// Callers must treat both the input and the returned schema as read-only.
+const normalizedSchemaCache = new WeakMap<object, unknown>();
+
 /**
  * Standalone normalizeJsonSchema function for backward compatibility
  * Ensures additionalProperties: false for object types in JSON schemas
  */
 export function normalizeJsonSchema<T>(input: T): T {
+  if (!input || typeof input !== "object") return input;
+  const cached = normalizedSchemaCache.get(input as object);
+  if (cached !== undefined) return cached as T;
+
   const seen = new WeakSet<object>();
   
   function walk(node: unknown): unknown {
@@ -319,7 +279,9 @@ export function normalizeJsonSchema<T>(input: T): T {
 
   try {
     const clone = JSON.parse(JSON.stringify(input)) as unknown;
-    return walk(clone) as T;
+    const normalized = walk(clone) as T;
+    normalizedSchemaCache.set(input as object, normalized);
+    return normalized;
   } catch {
     return input;
   }
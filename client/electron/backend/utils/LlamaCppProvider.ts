@@ -17,6 +17,7 @@ import { MIN_JSON_COMPLETION_TOKENS } from "./llmProviderTypes";
 import { llamaServerProvider } from "./LlamaServerProvider";
 import type { SupportedLang } from "./promptHelper";
 import { normalizeLanguage } from "./promptHelper";
+import { mapWithConcurrency } from "./concurrency";
 
 export interface LlamaCppResolvedConfig extends ProviderResolvedConfig {
   endpoint: string;
@@ -30,6 +31,9 @@ export interface LlamaCppResolvedConfig extends ProviderResolvedConfig {
 
 const trimEndpoint = (value?: string): string => (value ?? "").replace(/\/+$/, "");
 
+// Max concurrent /embedding requests sent to llama-server
+const EMBED_CONCURRENCY = 4;
+
 export interface LlamaCppEmbedRequest {
   content: string;
 }
@@ -38,6 +42,14 @@ export interface LlamaCppEmbedResponse {
   embedding: number[];
 }
 
+export interface LlamaCppBatchEmbedRequest {
+  input: string[];
+}
+
+export interface LlamaCppBatchEmbedResponse {
+  data?: Array<{ index?: number; embedding?: number[] }>;
+}
+
 export interface LlamaCppCompletionRequest {
   prompt: string;
   n_predict?: number;
@@ -66,6 +78,8 @@ const DEFAULT_JSON_TIMEOUT_MS = 60000;
 
 export class LlamaCppProvider extends BaseLLMProvider {
   protected readonly providerLabel: string = "LlamaCpp";
+  // Set once the running llama-server turns out not to serve /v1/embeddings
+  private batchEmbedUnsupported = false;
 
   protected resolveConfig(cfg: AppConfig): LlamaCppResolvedConfig {
     const section = cfg.llamacpp ?? {};
@@ -87,6 +101,11 @@ export class LlamaCppProvider extends BaseLLMProvider {
     return 'text-embedding'; // Not really used, model is loaded via path
   }
 
+  // Embeddings come from whichever text model llama-server has loaded
+  public resolveEmbedModel(): string {
+    return this.resolveConfig(configManager.getConfig()).textModelPath || this.getDefaultEmbedModel();
+  }
+
   protected getDefaultChatModel(): string {
     return 'text-generation'; // Not really used, model is loaded via path
   }
@@ -115,9 +134,15 @@ export class LlamaCppProvider extends BaseLLMProvider {
 
     logger.info(`Generating embeddings for ${inputs.length} inputs via llama-server`);
 
-    const embeddings: number[][] = [];
+    const batched = inputs.length > 1 ? await this.embedBatch(config.endpoint, inputs) : null;
+    if (batched) {
+      logger.info(`Generated ${batched.length} embeddings`);
+      return batched;
+    }
 
-    for (const input of inputs) {
+    // llama-server serves several slots in parallel; keep a few requests in
+    // flight instead of waiting for each embedding before sending the next
+    const embeddings = await mapWithConcurrency(inputs, EMBED_CONCURRENCY, async (input) => {
       try {
         const payload: LlamaCppEmbedRequest = { content: input };
         const response = await httpPostJson<LlamaCppEmbedResponse>(
@@ -131,17 +156,62 @@ export class LlamaCppProvider extends BaseLLMProvider {
           throw new Error("Invalid embedding response from llama-server");
         }
 
-        embeddings.push(response.data.embedding);
+        return response.data.embedding;
       } catch (error) {
         logger.error(`Failed to generate embedding for input: ${error}`);
         throw error;
       }
-    }
+    });
 
     logger.info(`Generated ${embeddings.length} embeddings`);
     return embeddings;
   }
 
+  /**
+   * Embed all inputs in one request via the OpenAI-compatible /v1/embeddings
+   * endpoint. Returns null when the server does not support it (or answers
+   * with an unusable payload) so the caller can fall back to /embedding.
+   */
+  private async embedBatch(endpoint: string, inputs: string[]): Promise<number[][] | null> {
+    if (this.batchEmbedUnsupported) {
+      return null;
+    }
+    const payload: LlamaCppBatchEmbedRequest = { input: inputs };
+    const response = await httpPostJson<LlamaCppBatchEmbedResponse>(
+      `${endpoint}/v1/embeddings`,
+      payload,
+      { Accept: "application/json" },
+      DEFAULT_JSON_TIMEOUT_MS
+    );
+    if (!response.ok) {
+      if (response.status === 404 || response.status === 501) {
+        this.batchEmbedUnsupported = true;
+      }
+      logger.warn("llama-server batch embedding unavailable; falling back to per-input requests", {
+        status: response.status,
+      });
+      return null;
+    }
+
+    const data = response.data?.data;
+    if (!Array.isArray(data) || data.length !== inputs.length) {
+      return null;
+    }
+    const embeddings: number[][] = new Array(inputs.length);
+    for (let i = 0; i < data.length; i++) {
+      const item = data[i];
+      const index = typeof item.index === "number" ? item.index : i;
+      if (!Array.isArray(item.embedding) || index < 0 || index >= inputs.length) {
+        return null;
+      }
+      embeddings[index] = item.embedding;
+    }
+    for (let i = 0; i < embeddings.length; i++) {
+      if (!embeddings[i]) return null;
+    }
+    return embeddings;
+  }
+
   /**
    * Generate structured JSON response
    */
@@ -175,7 +245,8 @@ export class LlamaCppProvider extends BaseLLMProvider {
     // Append JSON format instruction
     if (responseFormat?.json_schema) {
       fullPrompt += "\n\nRespond with valid JSON only. No markdown, no explanations.";
-      fullPrompt += `\nJSON Schema:\n${JSON.stringify(responseFormat.json_schema.schema, null, 2)}`;
+      // Compact schema: pretty-printing only adds prompt tokens
+      fullPrompt += `\nJSON Schema:\n${JSON.stringify(responseFormat.json_schema.schema)}`;
     }
 
     const payload: LlamaCppCompletionRequest = {
@@ -186,7 +257,8 @@ export class LlamaCppProvider extends BaseLLMProvider {
     };
 
     logger.info(`Generating structured JSON with llama-server`);
-    logger.debug(JSON.stringify(payload));
+    // Log sizes rather than re-serializing the whole prompt on every call
+    logger.debug("llama-server completion request", { promptChars: fullPrompt.length, n_predict: payload.n_predict });
     try {
       const response = await httpPostJson<LlamaCppCompletionResponse>(
         url,
@@ -195,7 +267,7 @@ export class LlamaCppProvider extends BaseLLMProvider {
         config.timeoutMs ?? 60000
       );
       logger.info(`Generating structured JSON with llama-server response received`);
-      logger.debug(JSON.stringify(response.data?.content));
+      logger.debug("llama-server completion response", { contentChars: response.data?.content?.length ?? 0 });
       if (!response.ok || !response.data?.content) {
         throw new Error("Empty response from llama-server");
       }
@@ -139,11 +139,11 @@ export class LlamaServerProvider {
 
       // Handle server output
       this.serverProcess.stdout?.on('data', (data) => {
-        logger.debug(`llama-server stdout: ${data.toString()}`);
+        logger.debug(() => `llama-server stdout: ${data.toString()}`);
       });
 
       this.serverProcess.stderr?.on('data', (data) => {
-        logger.debug(`llama-server stderr: ${data.toString()}`);
+        logger.debug(() => `llama-server stderr: ${data.toString()}`);
       });
 
       // Handle server exit
@@ -5,7 +5,7 @@
 
 import { configManager } from "../../configManager";
 import type { AppConfig } from "../../configManager";
-import { httpPostJson } from "./httpClient";
+import { httpPostJson, httpPostNdjson } from "./httpClient";
 import { logger } from "../../logger";
 import { BaseLLMProvider } from "./BaseLLMProvider";
 import type {
@@ -71,10 +71,30 @@ export interface OllamaGenerateResponseBody {
   eval_count?: number;
 }
 
+export interface OllamaGenerateStreamChunk extends Partial<OllamaGenerateResponseBody> {
+  done?: boolean;
+  error?: string;
+}
+
 export interface OllamaVisionGeneratePayload extends OllamaGeneratePayload {
   images: string[];
 }
 
+// Prompt role prefixes, so roles are not upper-cased on every message
+const ROLE_LABELS: Record<OllamaRole, string> = {
+  system: "SYSTEM",
+  user: "USER",
+  assistant: "ASSISTANT",
+};
+
+// Serialized JSON schemas by schema object, so module-level response formats
+// reuse their string across calls; per-call schemas are collected with them.
+const schemaStringCache = new WeakMap<object, string>();
+
+// Streamed JSON generation may wait this long for the first chunk (cold model
+// load plus prompt processing on CPU), then aborts only after
+// DEFAULT_JSON_TIMEOUT_MS without a new chunk
+const JSON_FIRST_CHUNK_TIMEOUT_MS = 300000;
 const DEFAULT_JSON_TIMEOUT_MS = 60000;
 
 export class OllamaProvider extends BaseLLMProvider {
@@ -95,6 +115,11 @@ export class OllamaProvider extends BaseLLMProvider {
     return "bge-m3";
   }
 
+  public resolveEmbedModel(overrideModel?: string): string {
+    const resolved = this.resolveConfig(configManager.getConfig());
+    return overrideModel || resolved.embedModel || resolved.chatModel || this.getDefaultEmbedModel();
+  }
+
   protected getDefaultChatModel(): string {
     return "qwen3:8b";
   }
@@ -186,7 +211,7 @@ export class OllamaProvider extends BaseLLMProvider {
     const payload: OllamaGeneratePayload = {
       model,
       prompt,
-      stream: false,
+      stream: true,
       think: false,
       options: { temperature, num_predict: tokenBudget },
     };
@@ -195,16 +220,28 @@ export class OllamaProvider extends BaseLLMProvider {
       payload.format = "json";
     }
 
-    const resp = await httpPostJson<OllamaGenerateResponseBody>(
+    // Stream the generation and collect fragments as they arrive instead of
+    // waiting for Ollama to buffer the whole response
+    const fragments: string[] = [];
+    const streamState: { error?: string } = {};
+    const resp = await httpPostNdjson<OllamaGenerateStreamChunk>(
       `${resolved.endpoint}/api/generate`,
       payload,
-      { Accept: "application/json" },
+      (chunk) => {
+        if (chunk.error) {
+          streamState.error = chunk.error;
+          return;
+        }
+        if (chunk.response) fragments.push(chunk.response);
+      },
+      { Accept: "application/x-ndjson" },
       DEFAULT_JSON_TIMEOUT_MS,
-      resolved.apiKey
+      resolved.apiKey,
+      JSON_FIRST_CHUNK_TIMEOUT_MS
     );
     
-    if (!resp.ok || !resp.data) {
-      const message = resp.error?.message || `Failed generate via ${this.providerLabel}: HTTP ${resp.status}`;
+    if (!resp.ok || streamState.error) {
+      const message = streamState.error || resp.error?.message || `Failed generate via ${this.providerLabel}: HTTP ${resp.status}`;
       logger.error("Structured JSON request failed", {
         provider: this.providerLabel,
         model,
@@ -214,7 +251,7 @@ export class OllamaProvider extends BaseLLMProvider {
       throw new Error(message);
     }
 
-    const raw = resp.data.response ?? "";
+    const raw = fragments.join("");
     const parsed = this.tryParseJson(raw);
     if (parsed !== undefined) {
       return { ...parsed, payload };
@@ -247,7 +284,7 @@ export class OllamaProvider extends BaseLLMProvider {
     const payload: OllamaVisionGeneratePayload = {
       model,
       prompt: options?.prompt || "What is in this picture? Describe it in detail.",
-      stream: false,
+      stream: true,
       think: false,
       images,
     };
@@ -256,16 +293,27 @@ export class OllamaProvider extends BaseLLMProvider {
       payload.options = { ...(payload.options || {}), num_predict: options.maxTokens };
     }
 
-    const resp = await httpPostJson<OllamaGenerateResponseBody>(
+    // Stream the description; the timeout is an idle timeout, so long
+    // generations are no longer cut off as long as tokens keep arriving
+    const fragments: string[] = [];
+    const streamState: { error?: string } = {};
+    const resp = await httpPostNdjson<OllamaGenerateStreamChunk>(
       `${resolved.endpoint}/api/generate`,
       payload,
-      { Accept: "application/json" },
+      (chunk) => {
+        if (chunk.error) {
+          streamState.error = chunk.error;
+          return;
+        }
+        if (chunk.response) fragments.push(chunk.response);
+      },
+      { Accept: "application/x-ndjson" },
       Math.max(30000, options?.timeoutMs ?? 300000),
       resolved.apiKey
     );
     
-    if (!resp.ok || !resp.data) {
-      const message = resp.error?.message || `Failed vision generate via ${this.providerLabel}: HTTP ${resp.status}`;
+    if (!resp.ok || streamState.error) {
+      const message = streamState.error || resp.error?.message || `Failed vision generate via ${this.providerLabel}: HTTP ${resp.status}`;
       logger.error("Vision request failed", {
         provider: this.providerLabel,
         model,
@@ -275,8 +323,7 @@ export class OllamaProvider extends BaseLLMProvider {
       throw new Error(message);
     }
     
-    const text = resp.data.response ?? "";
-    return typeof text === "string" ? text : String(text);
+    return fragments.join("");
   }
 
   protected messagesToPrompt(
@@ -284,11 +331,9 @@ export class OllamaProvider extends BaseLLMProvider {
     schema: StructuredResponseFormat["json_schema"],
     lang: SupportedLang
   ): string {
-    const parts: string[] = [];
-    for (const message of messages) {
-      const role = message.role || "user";
-      parts.push(`${role.toUpperCase()}: ${message.content}`);
-    }
+    const parts = messages.map(
+      (message) => `${ROLE_LABELS[message.role] ?? (message.role || "user").toUpperCase()}: ${message.content}`
+    );
 
     const schemaInstruction = this.buildSchemaInstruction(schema, lang);
     if (schemaInstruction) {
@@ -310,15 +355,18 @@ export class OllamaProvider extends BaseLLMProvider {
       return base;
     }
 
-    let schemaStr: string;
-    try {
-      schemaStr = JSON.stringify(schema.schema);
-    } catch (error) {
-      schemaStr = String(schema.schema);
-      logger.warn("Failed to stringify JSON schema", {
-        provider: this.providerLabel,
-        error,
-      });
+    let schemaStr = schemaStringCache.get(schema.schema);
+    if (schemaStr === undefined) {
+      try {
+        schemaStr = JSON.stringify(schema.schema);
+        schemaStringCache.set(schema.schema, schemaStr);
+      } catch (error) {
+        schemaStr = String(schema.schema);
+        logger.warn("Failed to stringify JSON schema", {
+          provider: this.providerLabel,
+          error,
+        });
+      }
     }
 
     const extra = lang === "zh"
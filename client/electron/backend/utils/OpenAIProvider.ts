@@ -13,12 +13,20 @@ import type {
   GenerateStructuredJsonParams,
   DescribeImageOptions,
 } from "./llmProviderTypes";
-import { MIN_JSON_COMPLETION_TOKENS } from "./llmProviderTypes";
+import { MIN_JSON_COMPLETION_TOKENS, JSON_BLOCK_RE } from "./llmProviderTypes";
+import { RateLimiter } from "./rateLimiter";
 import type {
   ChatCompletionMessageParam,
   ChatCompletionContentPart,
 } from "openai/resources/chat/completions";
 
+// Client-side request budget, kept under typical account RPM limits so bursts
+// (concurrent frame descriptions, batched imports) do not trip 429s
+const OPENAI_REQUESTS_PER_SECOND = 5;
+const OPENAI_REQUEST_BURST = 10;
+// The SDK retries 429/5xx itself with jittered backoff and honors Retry-After
+const OPENAI_MAX_RETRIES = 4;
+
 export class OpenAIProvider extends BaseLLMProvider {
   protected readonly providerLabel = "OpenAI";
 
@@ -52,12 +60,25 @@ export class OpenAIProvider extends BaseLLMProvider {
     return "gpt-4o-mini";
   }
 
-  private getClient(): OpenAI {
-    const config = this.resolveConfig(configManager.getConfig());
-    return new OpenAI({ 
-      apiKey: config.apiKey!, 
-      baseURL: config.baseUrl 
-    });
+  private client: OpenAI | null = null;
+  private clientKey = "";
+  private readonly limiter = new RateLimiter(OPENAI_REQUESTS_PER_SECOND, OPENAI_REQUEST_BURST);
+
+  /**
+   * Shared SDK client, rebuilt only when endpoint or API key changes so
+   * requests reuse its pooled connections
+   */
+  private getClient(config: ProviderResolvedConfig): OpenAI {
+    const key = `${config.baseUrl}\n${config.apiKey}`;
+    if (!this.client || this.clientKey !== key) {
+      this.client = new OpenAI({ 
+        apiKey: config.apiKey!, 
+        baseURL: config.baseUrl,
+        maxRetries: OPENAI_MAX_RETRIES,
+      });
+      this.clientKey = key;
+    }
+    return this.client;
   }
 
   public async embed(inputs: string[], overrideModel?: string): Promise<number[][]> {
@@ -66,9 +87,10 @@ export class OpenAIProvider extends BaseLLMProvider {
     const cfg = configManager.getConfig();
     const config = this.resolveConfig(cfg);
     const model = overrideModel || config.embedModel || this.getDefaultEmbedModel();
-    const client = this.getClient();
+    const client = this.getClient(config);
 
     try {
+      await this.limiter.acquire();
       const resp = await client.embeddings.create({ model, input: inputs });
       return resp.data.map((d) => d.embedding as number[]);
     } catch (e) {
@@ -93,7 +115,7 @@ export class OpenAIProvider extends BaseLLMProvider {
     const cfg = configManager.getConfig();
     const config = this.resolveConfig(cfg);
     const model = overrideModel || config.chatModel || this.getDefaultChatModel();
-    const client = this.getClient();
+    const client = this.getClient(config);
 
     try {
       const schema = responseFormat?.json_schema?.schema;
@@ -101,6 +123,7 @@ export class OpenAIProvider extends BaseLLMProvider {
       
       const tokenBudget = Math.max(maxTokens, MIN_JSON_COMPLETION_TOKENS);
 
+      await this.limiter.acquire();
       const resp = await client.chat.completions.create({
         model,
         temperature,
@@ -115,7 +138,7 @@ export class OpenAIProvider extends BaseLLMProvider {
       try {
         return JSON.parse(text);
       } catch {
-        const match = text.match(/\{[\s\S]*\}|\[[\s\S]*\]/);
+        const match = text.match(JSON_BLOCK_RE);
         if (match) return JSON.parse(match[0]);
         throw new Error("Model did not return valid JSON");
       }
@@ -138,7 +161,7 @@ export class OpenAIProvider extends BaseLLMProvider {
     const cfg = configManager.getConfig();
     const config = this.resolveConfig(cfg);
     const model = overrideModel || config.visionModel || this.getDefaultVisionModel();
-    const client = this.getClient();
+    const client = this.getClient(config);
 
     try {
       const content: ChatCompletionContentPart[] = [
@@ -146,6 +169,7 @@ export class OpenAIProvider extends BaseLLMProvider {
         { type: "image_url", image_url: { url: `data:image/png;base64,${imageBase64}` } },
       ];
 
+      await this.limiter.acquire();
       const resp = await client.chat.completions.create({
         model,
         messages: [{ role: "user", content }],
@@ -163,7 +187,7 @@ export class OpenAIProvider extends BaseLLMProvider {
 
   public async checkServiceHealth(): Promise<boolean> {
     try {
-      const client = this.getClient();
+      const client = this.getClient(this.resolveConfig(configManager.getConfig()));
       const models = await client.models.list();
       // If we can successfully list models, the service is healthy
       return models.data.length > 0;
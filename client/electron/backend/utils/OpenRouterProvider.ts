@@ -12,7 +12,9 @@ import type {
   GenerateStructuredJsonParams,
   DescribeImageOptions,
 } from "./llmProviderTypes";
-import { MIN_JSON_COMPLETION_TOKENS } from "./llmProviderTypes";
+import { MIN_JSON_COMPLETION_TOKENS, JSON_BLOCK_RE } from "./llmProviderTypes";
+import { RateLimiter } from "./rateLimiter";
+import { isRetryableStatus, retryDelayMs, sleep } from "./httpClient";
 import type {
   ChatCompletionMessageParam,
   ChatCompletionContentPart,
@@ -36,6 +38,7 @@ interface OpenRouterChatCompletionResponseChoice {
     role?: string;
     content?: string | ChatCompletionContentPart[];
   };
+  finish_reason?: string | null;
 }
 
 interface OpenRouterErrorPayload {
@@ -68,11 +71,42 @@ const DEFAULT_BASE_URL = "https://openrouter.ai/api/v1";
 const DEFAULT_TIMEOUT_MS = 60000;
 const DEFAULT_REFERER = "https://github.com/pega2077/ai_file_manager";
 const DEFAULT_TITLE = "AI File Manager";
+// Client-side request budget; free-tier OpenRouter keys are limited per
+// minute, so bursts are smoothed here instead of surfacing as 429s
+const OPENROUTER_REQUESTS_PER_SECOND = 5;
+const OPENROUTER_REQUEST_BURST = 10;
+const openRouterLimiter = new RateLimiter(OPENROUTER_REQUESTS_PER_SECOND, OPENROUTER_REQUEST_BURST);
+const OPENROUTER_MAX_RETRIES = 3;
 
 export class OpenRouterProvider extends BaseLLMProvider {
   protected readonly providerLabel = "OpenRouter";
 
+  // Resolved config and base request headers, reused until the openrouter
+  // config section (replaced wholesale on update) or the env key changes
+  private resolvedSection: AppConfig["openrouter"] | null = null;
+  private resolvedEnvKey: string | undefined;
+  private resolved: OpenRouterResolvedConfig | null = null;
+  private baseRequestHeaders: Record<string, string> = {};
+
   protected resolveConfig(cfg: AppConfig): OpenRouterResolvedConfig {
+    const section = cfg.openrouter;
+    const envKey = process.env.OPENROUTER_API_KEY;
+    if (this.resolved && section && section === this.resolvedSection && envKey === this.resolvedEnvKey) {
+      return this.resolved;
+    }
+    const resolved = this.buildResolvedConfig(cfg);
+    this.resolved = resolved;
+    this.resolvedSection = section ?? null;
+    this.resolvedEnvKey = envKey;
+    this.baseRequestHeaders = {
+      "Content-Type": "application/json",
+      Authorization: `Bearer ${resolved.apiKey}`,
+      ...resolved.headers,
+    };
+    return resolved;
+  }
+
+  private buildResolvedConfig(cfg: AppConfig): OpenRouterResolvedConfig {
     const oc = cfg.openrouter || {};
     const apiKey = ((oc.openrouterApiKey) || process.env.OPENROUTER_API_KEY || "").trim();
     
@@ -152,74 +186,88 @@ export class OpenRouterProvider extends BaseLLMProvider {
   ): Promise<T> {
     const config = this.resolveConfig(configManager.getConfig()) as OpenRouterResolvedConfig;
     const url = path.startsWith("http") ? path : `${config.baseUrl}${path.startsWith("/") ? path : `/${path}`}`;
-    const controller = new AbortController();
-    const effectiveApiKey = options?.apiKeyOverride && options.apiKeyOverride.trim()
-      ? options.apiKeyOverride.trim()
-      : config.apiKey;
+    const apiKeyOverride = options?.apiKeyOverride?.trim();
+    const headers = apiKeyOverride || options?.headers
+      ? {
+          ...this.baseRequestHeaders,
+          ...(apiKeyOverride ? { Authorization: `Bearer ${apiKeyOverride}` } : {}),
+          ...(options?.headers ?? {}),
+        }
+      : this.baseRequestHeaders;
     const effectiveTimeout = typeof options?.timeoutMs === "number" && options.timeoutMs > 0
       ? options.timeoutMs
       : config.timeoutMs;
-    const timer = setTimeout(() => controller.abort(), effectiveTimeout);
+    const requestBody = JSON.stringify(body);
 
-    try {
-      const response = await fetch(url, {
-        method: "POST",
-        headers: {
-          "Content-Type": "application/json",
-          Authorization: `Bearer ${effectiveApiKey}`,
-          ...config.headers,
-          ...(options?.headers ?? {}),
-        },
-        body: JSON.stringify(body),
-        signal: controller.signal,
-      });
+    for (let attempt = 0; ; attempt++) {
+      await openRouterLimiter.acquire();
+      const controller = new AbortController();
+      const timer = setTimeout(() => controller.abort(), effectiveTimeout);
 
-      const rawText = await response.text();
-      if (!response.ok) {
-        let errorMessage = `OpenRouter request failed with status ${response.status}`;
-        let parsed: { error?: OpenRouterErrorPayload } | undefined;
-        try {
-          parsed = rawText ? JSON.parse(rawText) as { error?: OpenRouterErrorPayload } : undefined;
-          if (parsed?.error?.message) {
-            errorMessage = parsed.error.message;
+      try {
+        const response = await fetch(url, {
+          method: "POST",
+          headers,
+          body: requestBody,
+          signal: controller.signal,
+        });
+
+        if (!response.ok && attempt < OPENROUTER_MAX_RETRIES && isRetryableStatus(response.status)) {
+          await response.body?.cancel().catch(() => undefined);
+          const delay = retryDelayMs(attempt, response.headers.get("retry-after"));
+          logger.warn("OpenRouter request retrying", { url, status: response.status, attempt: attempt + 1, delayMs: delay });
+          clearTimeout(timer);
+          await sleep(delay);
+          continue;
+        }
+
+        const rawText = await response.text();
+        if (!response.ok) {
+          let errorMessage = `OpenRouter request failed with status ${response.status}`;
+          let parsed: { error?: OpenRouterErrorPayload } | undefined;
+          try {
+            parsed = rawText ? JSON.parse(rawText) as { error?: OpenRouterErrorPayload } : undefined;
+            if (parsed?.error?.message) {
+              errorMessage = parsed.error.message;
+            }
+          } catch {
+            // Ignore JSON parse errors for error payload
           }
-        } catch {
-          // Ignore JSON parse errors for error payload
+          logger.error("OpenRouter request failed", {
+            url,
+            status: response.status,
+            message: errorMessage,
+            providerErrorCode: parsed?.error?.code,
+            providerMetadata: parsed?.error?.metadata,
+            rawResponse: rawText,
+          });
+          throw new Error(errorMessage);
         }
-        logger.error("OpenRouter request failed", {
-          url,
-          status: response.status,
-          message: errorMessage,
-          providerErrorCode: parsed?.error?.code,
-          providerMetadata: parsed?.error?.metadata,
-          rawResponse: rawText,
-        });
-        throw new Error(errorMessage);
-      }
 
-      if (!rawText) {
-        return {} as T;
-      }
+        if (!rawText) {
+          return {} as T;
+        }
 
-      try {
-        return JSON.parse(rawText) as T;
-      } catch (parseError) {
-        logger.error("OpenRouter response parsing failed", {
-          url,
-          message: (parseError as Error).message,
-        });
-        throw new Error("Invalid JSON response from OpenRouter");
-      }
-    } catch (error) {
-      const err = error as Error;
-      if (err.name === "AbortError") {
-        logger.error("OpenRouter request timed out", { url, timeoutMs: effectiveTimeout });
-        throw new Error("OpenRouter request timed out");
+        try {
+          return JSON.parse(rawText) as T;
+        } catch (parseError) {
+          logger.error("OpenRouter response parsing failed", {
+            url,
+            message: (parseError as Error).message,
+          });
+          throw new Error("Invalid JSON response from OpenRouter");
+        }
+      } catch (error) {
+        const err = error as Error;
+        if (err.name === "AbortError") {
+          logger.error("OpenRouter request timed out", { url, timeoutMs: effectiveTimeout });
+          throw new Error("OpenRouter request timed out");
+        }
+        logger.error("OpenRouter request error", { url, message: err.message });
+        throw err;
+      } finally {
+        clearTimeout(timer);
       }
-      logger.error("OpenRouter request error", { url, message: err.message });
-      throw err;
-    } finally {
-      clearTimeout(timer);
     }
   }
 
@@ -304,9 +352,11 @@ export class OpenRouterProvider extends BaseLLMProvider {
           : { type: "json_object" },
       };
       
-      logger.info("OpenRouter payload:", payload);
+      // Log a summary rather than the full payload/response: the logger
+      // JSON-serializes its arguments, which re-encodes the whole prompt.
+      logger.info("OpenRouter request", { model, messages: payload.messages.length, max_tokens: tokenBudget });
       const resp = await this.postOpenRouterJson<OpenRouterChatCompletionResponse>("/chat/completions", payload);
-      logger.info("OpenRouter response:", resp);
+      logger.info("OpenRouter response", { choices: resp.choices?.length ?? 0, finish_reason: resp.choices?.[0]?.finish_reason });
       
       if (resp.error) {
         logger.error("OpenRouter provider error", {
@@ -332,7 +382,7 @@ export class OpenRouterProvider extends BaseLLMProvider {
       try {
         return JSON.parse(text);
       } catch {
-        const match = text.match(/\{[\s\S]*\}|\[[\s\S]*\]/);
+        const match = text.match(JSON_BLOCK_RE);
         if (match) return JSON.parse(match[0]);
         throw new Error("Model did not return valid JSON");
       }
@@ -1,7 +1,7 @@
 import { configManager } from "../../configManager";
 import { logger } from "../../logger";
 import { httpPostJson } from "./httpClient";
-import { MIN_JSON_COMPLETION_TOKENS } from "./llmProviderTypes";
+import { MIN_JSON_COMPLETION_TOKENS, JSON_BLOCK_RE } from "./llmProviderTypes";
 
 export type BailianRole = "system" | "user" | "assistant";
 
@@ -191,7 +191,7 @@ export async function generateStructuredJsonWithBailian(
   try {
     return JSON.parse(content);
   } catch (err) {
-    const match = content.match(/\{[\s\S]*\}|\[[\s\S]*\]/);
+    const match = content.match(JSON_BLOCK_RE);
     if (match) {
       return JSON.parse(match[0]);
     }
@@ -248,6 +248,11 @@ export async function describeImageWithBailian(
   return typeof choice === "string" ? choice.trim() : "";
 }
 
+/** Model embedWithBailian() will send for the current config */
+export function resolveBailianEmbedModel(overrideModel?: string): string {
+  return overrideModel || resolveConfig().embedModel;
+}
+
 export async function embedWithBailian(inputs: string[], overrideModel?: string): Promise<number[][]> {
   if (!Array.isArray(inputs) || inputs.length === 0) {
     return [];
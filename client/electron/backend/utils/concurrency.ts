@@ -0,0 +1,29 @@
+/**
+ * Map items through an async function with at most `limit` calls in flight.
+ * Results keep the input order. The first rejection rejects the returned
+ * promise immediately and stops workers from starting further items; calls
+ * already in flight are left to finish on their own.
+ */
+export async function mapWithConcurrency<T, R>(
+  items: readonly T[],
+  limit: number,
+  fn: (item: T, index: number) => Promise<R>
+): Promise<R[]> {
+  const results: R[] = new Array(items.length);
+  const workerCount = Math.max(1, Math.min(Math.floor(limit) || 1, items.length));
+  let next = 0;
+  let failed = false;
+  const worker = async (): Promise<void> => {
+    while (!failed && next < items.length) {
+      const index = next++;
+      try {
+        results[index] = await fn(items[index], index);
+      } catch (err) {
+        failed = true;
+        throw err;
+      }
+    }
+  };
+  await Promise.all(Array.from({ length: workerCount }, () => worker()));
+  return results;
+}
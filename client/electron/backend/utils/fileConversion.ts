@@ -1,5 +1,8 @@
-import { promises as fsp } from "fs";
+import { createWriteStream, openAsBlob, promises as fsp } from "fs";
 import path from "path";
+import { Readable } from "stream";
+import { pipeline } from "stream/promises";
+import type { ReadableStream as NodeReadableStream } from "stream/web";
 import { configManager } from "../../configManager";
 import { httpGetJson, httpPostForm, httpPostJson } from "./httpClient";
 import { logger } from "../../logger";
@@ -52,25 +55,27 @@ function resolveServiceBase(): string {
   return base.replace(/\/$/, "");
 }
 
+// Extension/format aliases accepted by the converter service, keyed lowercase
+const PANDOC_FORMATS: ReadonlyMap<string, string> = new Map([
+  ["md", "markdown"],
+  ["markdown", "markdown"],
+  ["txt", "markdown"], // treat plain text as markdown for uniformity
+  ["htm", "html"],
+  ["html", "html"],
+  ["xhtml", "html"],
+  ["doc", "doc"],
+  ["docx", "docx"],
+  ["odt", "odt"],
+  ["rtf", "rtf"],
+  ["pdf", "pdf"],
+  ["epub", "epub"],
+  ["csv", "markdown"], // will render as code blocks or simple tables after conversion
+  ["json", "markdown"],
+]);
+
 function mapToPandocFormat(fmt: string): string {
   const f = (fmt || "").toLowerCase();
-  const map: Record<string, string> = {
-    md: "markdown",
-    markdown: "markdown",
-    txt: "markdown", // treat plain text as markdown for uniformity
-    htm: "html",
-    html: "html",
-    xhtml: "html",
-    doc: "doc",
-    docx: "docx",
-    odt: "odt",
-    rtf: "rtf",
-    pdf: "pdf",
-    epub: "epub",
-    csv: "markdown", // will render as code blocks or simple tables after conversion
-    json: "markdown",
-  };
-  return map[f] || f;
+  return PANDOC_FORMATS.get(f) ?? f;
 }
 
 async function downloadToFile(url: string, dest: string, timeoutMs = 300000): Promise<void> {
@@ -78,9 +83,21 @@ async function downloadToFile(url: string, dest: string, timeoutMs = 300000): Pr
   const timer = setTimeout(() => controller.abort(), timeoutMs);
   try {
     const resp = await fetch(url, { signal: controller.signal });
-    if (!resp.ok) throw new Error(`HTTP ${resp.status}`);
-    const ab = await resp.arrayBuffer();
-    await fsp.writeFile(dest, Buffer.from(ab));
+    if (!resp.ok) {
+      await resp.body?.cancel().catch(() => undefined);
+      throw new Error(`HTTP ${resp.status}`);
+    }
+    if (!resp.body) {
+      await fsp.writeFile(dest, "");
+      return;
+    }
+    // Stream to disk as chunks arrive rather than holding the whole result in memory
+    try {
+      await pipeline(Readable.fromWeb(resp.body as unknown as NodeReadableStream<Uint8Array>), createWriteStream(dest));
+    } catch (err) {
+      await fsp.rm(dest, { force: true }).catch(() => undefined);
+      throw err;
+    }
   } finally {
     clearTimeout(timer);
   }
@@ -101,13 +118,14 @@ export async function convertFileViaService(filePath: string, sourceFormat: stri
   const outFmt = mapToPandocFormat(outputFormat);
 
   // 1) Upload
+  // File-backed blob: the upload streams from disk instead of holding (and
+  // previously copying) the whole document in memory
   const form = new FormData();
-  const fileBuf = await fsp.readFile(filePath);
+  const blob = await openAsBlob(filePath);
   const fileName = path.basename(filePath);
-  const blob = new Blob([new Uint8Array(fileBuf)]);
   form.append("file", blob, fileName);
 
-  logger.info("Converter: uploading file", { fileName, size: fileBuf.byteLength });
+  logger.info("Converter: uploading file", { fileName, size: blob.size });
   const up = await httpPostForm<UploadResponse>(`${base}/upload`, form);
   if (!up.ok || !up.data?.file?.path) {
     const msg = up.error?.message || `Upload failed HTTP ${up.status}`;
@@ -168,6 +186,9 @@ export async function convertFileViaService(filePath: string, sourceFormat: stri
   return dest;
 }
 
+// Text-like extensions copied as-is instead of going through the converter
+const PASS_THROUGH_TEXT_EXTS: ReadonlySet<string> = new Set(["txt", "md", "csv", "json", "html", "htm"]);
+
 /**
  * Ensure a local file is in .txt format by converting or extracting plain text.
  * For simple text-like formats, we read and write to .txt.
@@ -179,21 +200,18 @@ export async function ensureTxtFile(localFilePath: string): Promise<string> {
     const ext = path.extname(localFilePath).toLowerCase().replace(/^\./, "");
     const tempDir = await ensureTempDir();
 
-    // quick pass-through extensions
-    const pass = new Set(["txt", "md", "csv", "json", "html", "htm"]);
-    if (pass.has(ext)) {
-      const buf = await fsp.readFile(localFilePath);
-      const text = buf.toString("utf8");
+    if (PASS_THROUGH_TEXT_EXTS.has(ext)) {
+      // Byte copy; callers decode as UTF-8 when they read the .txt
       const out = path.join(tempDir, `${Date.now()}_${path.basename(localFilePath, path.extname(localFilePath))}.txt`);
-      await fsp.writeFile(out, text, "utf8");
+      await fsp.copyFile(localFilePath, out);
       return out;
     }
 
-    // Otherwise attempt conversion to markdown via service, then write .txt (keeping markdown text content)
+    // Otherwise attempt conversion to markdown via service; the downloaded
+    // markdown already lives in the temp dir, so it becomes the .txt by rename
     const mdPath = await convertFileViaService(localFilePath, ext, "md");
-    const mdText = await fsp.readFile(mdPath, "utf8");
     const out = path.join(tempDir, `${Date.now()}_${path.basename(localFilePath, path.extname(localFilePath))}.txt`);
-    await fsp.writeFile(out, mdText, "utf8");
+    await fsp.rename(mdPath, out);
     return out;
   } catch (error) {
     const errMsg = error instanceof Error ? error.message : String(error);
@@ -6,13 +6,27 @@ export function toNumber(val: unknown, def: number): number {
   return Number.isFinite(n) && n > 0 ? Math.trunc(n) : def;
 }
 
+// Any non-whitespace character; tests without allocating a trimmed copy
+const NON_WHITESPACE_RE = /\S/;
+
 export function isNonEmptyString(v: unknown): v is string {
-  return typeof v === "string" && v.trim().length > 0;
+  return typeof v === "string" && NON_WHITESPACE_RE.test(v);
+}
+
+// Trimmed, non-blank strings from a list; each value is trimmed only once
+export function toTrimmedStrings(values: readonly unknown[]): string[] {
+  const out: string[] = [];
+  for (const value of values) {
+    if (typeof value !== "string") continue;
+    const trimmed = value.trim();
+    if (trimmed) out.push(trimmed);
+  }
+  return out;
 }
 
 export function parseTags(v: unknown): string[] | undefined {
   if (!v) return undefined;
-  if (Array.isArray(v)) return v.filter((t) => typeof t === "string" && t.trim()).map((t) => t.trim());
+  if (Array.isArray(v)) return toTrimmedStrings(v);
   return undefined;
 }
 
@@ -126,3 +140,20 @@ export const CATEGORY_EXTENSIONS: Record<string, string[]> = {
   archive: ["zip", "rar", "7z", "tar", "gz", "bz2", "xz"],
   other: [],
 };
+
+// Reverse lookup built once from CATEGORY_EXTENSIONS; the first category listing
+// an extension wins, matching the previous Object.entries() scan order.
+const EXTENSION_CATEGORY: ReadonlyMap<string, string> = (() => {
+  const map = new Map<string, string>();
+  for (const [cat, exts] of Object.entries(CATEGORY_EXTENSIONS)) {
+    for (const ext of exts) {
+      if (!map.has(ext)) map.set(ext, cat);
+    }
+  }
+  return map;
+})();
+
+// Infer a file category from its extension, falling back to "other"
+export function getCategoryByExt(ext: string): string {
+  return EXTENSION_CATEGORY.get(ext.toLowerCase()) ?? "other";
+}
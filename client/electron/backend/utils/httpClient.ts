@@ -7,6 +7,44 @@ export interface HttpJsonResponse<T> {
   error?: { message: string };
 }
 
+// Parse a JSON response body; empty or invalid text yields undefined
+function parseJsonBody<T>(text: string): T | undefined {
+  if (!text) return undefined;
+  try {
+    return JSON.parse(text) as T;
+  } catch {
+    return undefined;
+  }
+}
+
+const RETRY_BASE_DELAY_MS = 1000;
+const RETRY_MAX_DELAY_MS = 30000;
+
+/** Rate limiting and transient upstream failures; 501 is a permanent "not supported" */
+export function isRetryableStatus(status: number): boolean {
+  return status === 429 || (status >= 500 && status !== 501);
+}
+
+/**
+ * Delay before retry number `attempt` (0-based). A Retry-After header (seconds
+ * or HTTP date) wins; otherwise exponential backoff with jitter. Both capped.
+ */
+export function retryDelayMs(attempt: number, retryAfter?: string | null): number {
+  if (retryAfter) {
+    const seconds = Number(retryAfter);
+    const fromHeader = Number.isFinite(seconds) ? seconds * 1000 : Date.parse(retryAfter) - Date.now();
+    if (Number.isFinite(fromHeader) && fromHeader >= 0) {
+      return Math.min(fromHeader, RETRY_MAX_DELAY_MS);
+    }
+  }
+  const backoff = RETRY_BASE_DELAY_MS * 2 ** attempt;
+  return Math.min(backoff + Math.random() * RETRY_BASE_DELAY_MS, RETRY_MAX_DELAY_MS);
+}
+
+export function sleep(ms: number): Promise<void> {
+  return new Promise((resolve) => setTimeout(resolve, ms));
+}
+
 export async function httpGetJson<T>(url: string, headers?: Record<string, string>, timeoutMs = 15000, token?: string): Promise<HttpJsonResponse<T>> {
   const controller = new AbortController();
   const timer = setTimeout(() => controller.abort(), timeoutMs);
@@ -18,12 +56,12 @@ export async function httpGetJson<T>(url: string, headers?: Record<string, strin
     const resp = await fetch(url, { headers: mergedHeaders, signal: controller.signal });
     const status = resp.status;
     const ok = resp.ok;
-    const text = await resp.text();
-    let data: unknown;
-    try { data = text ? JSON.parse(text) : undefined; } catch (e) { data = undefined; }
-    return ok
-      ? { ok, status, data: data as T }
-      : { ok, status, error: { message: `HTTP ${status}` } };
+    if (!ok) {
+      // Error bodies are not surfaced to callers; skip reading and parsing them
+      await resp.body?.cancel().catch(() => undefined);
+      return { ok, status, error: { message: `HTTP ${status}` } };
+    }
+    return { ok, status, data: parseJsonBody<T>(await resp.text()) };
   } catch (err) {
     logger.error("HTTP GET failed", { url, err: String(err) });
     return { ok: false, status: 0, error: { message: (err as Error).message } };
@@ -32,7 +70,24 @@ export async function httpGetJson<T>(url: string, headers?: Record<string, strin
   }
 }
 
-export async function httpPostJson<T>(url: string, body: unknown, headers?: Record<string, string>, timeoutMs = 30000, token?: string): Promise<HttpJsonResponse<T>> {
+/**
+ * POST JSON and parse the JSON reply. With `retries` > 0, 429/5xx responses are
+ * retried with backoff (see retryDelayMs); local servers keep the default of 0.
+ */
+export async function httpPostJson<T>(url: string, body: unknown, headers?: Record<string, string>, timeoutMs = 30000, token?: string, retries = 0): Promise<HttpJsonResponse<T>> {
+  const payload = JSON.stringify(body);
+  for (let attempt = 0; ; attempt++) {
+    const result = await postJsonOnce<T>(url, payload, headers, timeoutMs, token);
+    if (result.ok || attempt >= retries || !isRetryableStatus(result.status)) {
+      return result;
+    }
+    const delay = retryDelayMs(attempt, result.retryAfter);
+    logger.warn("HTTP POST retrying", { url, status: result.status, attempt: attempt + 1, delayMs: delay });
+    await sleep(delay);
+  }
+}
+
+async function postJsonOnce<T>(url: string, payload: string, headers: Record<string, string> | undefined, timeoutMs: number, token?: string): Promise<HttpJsonResponse<T> & { retryAfter?: string | null }> {
   const controller = new AbortController();
   const timer = setTimeout(() => controller.abort(), timeoutMs);
   let mergedHeaders: Record<string, string> = { "Content-Type": "application/json", ...(headers || {}) };
@@ -40,22 +95,22 @@ export async function httpPostJson<T>(url: string, body: unknown, headers?: Reco
     mergedHeaders = { ...mergedHeaders, Authorization: `Bearer ${token}` };
   }
   try {
-    // console.log("HTTP POST request to:", url, "\nwith headers:\n", mergedHeaders, "\nwith body:\n", body);
+    // console.log("HTTP POST request to:", url, "\nwith headers:\n", mergedHeaders, "\nwith body:\n", payload);
     const resp = await fetch(url, {
       method: "POST",
       headers: mergedHeaders,
-      body: JSON.stringify(body),
+      body: payload,
       //signal: controller.signal,
     });
     // console.log("HTTP POST response status:", resp.status,resp.ok);
     const status = resp.status;
     const ok = resp.ok;
-    const text = await resp.text();
-    let data: unknown;
-    try { data = text ? JSON.parse(text) : undefined; } catch (e) { data = undefined; }
-    return ok
-      ? { ok, status, data: data as T }
-      : { ok, status, error: { message: `HTTP ${status}` } };
+    if (!ok) {
+      // Error bodies are not surfaced to callers; skip reading and parsing them
+      await resp.body?.cancel().catch(() => undefined);
+      return { ok, status, error: { message: `HTTP ${status}` }, retryAfter: resp.headers.get("retry-after") };
+    }
+    return { ok, status, data: parseJsonBody<T>(await resp.text()) };
   } catch (err) {
     logger.error("HTTP POST failed", { url, err: String(err) });
     return { ok: false, status: 0, error: { message: (err as Error).message } };
@@ -80,12 +135,12 @@ export async function httpPostForm<T>(url: string, form: FormData, headers?: Rec
     });
     const status = resp.status;
     const ok = resp.ok;
-    const text = await resp.text();
-    let data: unknown;
-    try { data = text ? JSON.parse(text) : undefined; } catch (e) { data = undefined; }
-    return ok
-      ? { ok, status, data: data as T }
-      : { ok, status, error: { message: `HTTP ${status}` } };
+    if (!ok) {
+      // Error bodies are not surfaced to callers; skip reading and parsing them
+      await resp.body?.cancel().catch(() => undefined);
+      return { ok, status, error: { message: `HTTP ${status}` } };
+    }
+    return { ok, status, data: parseJsonBody<T>(await resp.text()) };
   } catch (err) {
     logger.error("HTTP POST form failed", { url, err: String(err) });
     return { ok: false, status: 0, error: { message: (err as Error).message } };
@@ -93,3 +148,83 @@ export async function httpPostForm<T>(url: string, form: FormData, headers?: Rec
     clearTimeout(timer);
   }
 }
+
+// Any non-whitespace character; used to skip blank NDJSON lines
+const NON_BLANK_RE = /\S/;
+
+/**
+ * POST a JSON body and consume a newline-delimited JSON (NDJSON) response as it
+ * arrives, invoking onMessage for every parsed line. The first chunk may take
+ * up to firstChunkTimeoutMs (model load and prompt processing); after that the
+ * timeout is an idle timeout re-armed whenever a chunk is received, so long
+ * generations keep going as long as the server keeps streaming.
+ */
+export async function httpPostNdjson<T>(
+  url: string,
+  body: unknown,
+  onMessage: (message: T) => void,
+  headers?: Record<string, string>,
+  idleTimeoutMs = 30000,
+  token?: string,
+  firstChunkTimeoutMs = idleTimeoutMs
+): Promise<HttpJsonResponse<undefined>> {
+  const controller = new AbortController();
+  let timer = setTimeout(() => controller.abort(), firstChunkTimeoutMs);
+  const rearm = () => {
+    clearTimeout(timer);
+    timer = setTimeout(() => controller.abort(), idleTimeoutMs);
+  };
+  let mergedHeaders: Record<string, string> = { "Content-Type": "application/json", ...(headers || {}) };
+  if (token) {
+    mergedHeaders = { ...mergedHeaders, Authorization: `Bearer ${token}` };
+  }
+  const emit = (line: string) => {
+    // JSON.parse tolerates surrounding whitespace (including \r); only blank lines are skipped
+    if (!NON_BLANK_RE.test(line)) return;
+    try {
+      onMessage(JSON.parse(line) as T);
+    } catch {
+      logger.warn("Skipping malformed NDJSON line", { url, snippet: line.trim().slice(0, 200) });
+    }
+  };
+  try {
+    const resp = await fetch(url, {
+      method: "POST",
+      headers: mergedHeaders,
+      body: JSON.stringify(body),
+      signal: controller.signal,
+    });
+    const status = resp.status;
+    if (!resp.ok || !resp.body) {
+      await resp.body?.cancel().catch(() => undefined);
+      return { ok: false, status, error: { message: `HTTP ${status}` } };
+    }
+    const reader = resp.body.getReader();
+    const decoder = new TextDecoder();
+    let buffered = "";
+    for (;;) {
+      const { done, value } = await reader.read();
+      if (done) break;
+      rearm();
+      buffered += decoder.decode(value, { stream: true });
+      // Walk complete lines by offset and drop the consumed prefix once per
+      // read, instead of re-slicing the remaining buffer after every line
+      let start = 0;
+      let newline = buffered.indexOf("\n", start);
+      while (newline !== -1) {
+        emit(buffered.slice(start, newline));
+        start = newline + 1;
+        newline = buffered.indexOf("\n", start);
+      }
+      if (start > 0) buffered = buffered.slice(start);
+    }
+    buffered += decoder.decode();
+    emit(buffered);
+    return { ok: true, status };
+  } catch (err) {
+    logger.error("HTTP POST stream failed", { url, err: String(err) });
+    return { ok: false, status: 0, error: { message: (err as Error).message } };
+  } finally {
+    clearTimeout(timer);
+  }
+}
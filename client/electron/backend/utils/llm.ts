@@ -1,3 +1,4 @@
+import { createHash } from "crypto";
 import { configManager } from "../../configManager";
 import type { SupportedLang } from "./promptHelper";
 import {
@@ -8,26 +9,31 @@ import {
 } from "./ollama";
 import { pegaOllamaClient } from "./pegaOllama";
 import {
+  openAIProvider,
   embedWithOpenAI,
   generateStructuredJsonWithOpenAI,
   describeImageWithOpenAI,
 } from "./openai";
 import {
+  openRouterProvider,
   generateStructuredJsonWithOpenRouter,
   describeImageWithOpenRouter,
   embedWithOpenRouter,
 } from "./openrouter";
 import {
   embedWithPegaOpenRouter,
+  resolvePegaOpenRouterEmbedModel,
   generateStructuredJsonWithPegaOpenRouter,
   describeImageWithPegaOpenRouter,
 } from "./pegaOpenrouter";
 import {
   embedWithBailian,
+  resolveBailianEmbedModel,
   generateStructuredJsonWithBailian,
   describeImageWithBailian,
 } from "./bailian";
 import { llamaCppProvider } from "./LlamaCppProvider";
+import { mapWithConcurrency } from "./concurrency";
 import type { ChatCompletionMessageParam } from "openai/resources/chat/completions";
 import { MIN_JSON_COMPLETION_TOKENS } from "./llmProviderTypes";
 
@@ -120,26 +126,228 @@ export function getActiveModelName(task: LlmTask, providerOverride?: ProviderNam
   return oc.ollamaModel || cfg.ollamaModel || "";
 }
 
-export async function embedText(inputs: string[], overrideModel?: string): Promise<number[][]> {
-  const provider = getActiveProvider();
-  if (provider === "openai" || provider === "azure-openai") {
-    return embedWithOpenAI(inputs, overrideModel);
+type EmbedFn = (inputs: string[], overrideModel?: string) => Promise<number[][]>;
+
+interface EmbedRoute {
+  embed: EmbedFn;
+  /** Model the route will actually call; keys the embedding cache */
+  model: (overrideModel?: string) => string;
+}
+
+// Embedding entry point per provider, resolved once per embedText() call.
+// Pega's two backends get distinct model keys since their vectors differ.
+const EMBED_DISPATCH: Record<ProviderName, () => EmbedRoute> = {
+  ollama: () => ({
+    embed: (inputs, model) => ollamaClient.embed(inputs, model),
+    model: (model) => ollamaClient.resolveEmbedModel(model),
+  }),
+  openai: () => ({ embed: embedWithOpenAI, model: (model) => openAIProvider.resolveEmbedModel(model) }),
+  "azure-openai": () => ({ embed: embedWithOpenAI, model: (model) => openAIProvider.resolveEmbedModel(model) }),
+  openrouter: () => ({ embed: embedWithOpenRouter, model: (model) => openRouterProvider.resolveEmbedModel(model) }),
+  bailian: () => ({ embed: embedWithBailian, model: resolveBailianEmbedModel }),
+  pega: () =>
+    getPegaMode() === "openrouter"
+      ? { embed: embedWithPegaOpenRouter, model: (model) => `openrouter:${resolvePegaOpenRouterEmbedModel(model)}` }
+      : {
+          embed: (inputs, model) => pegaOllamaClient.embed(inputs, model),
+          model: (model) => `ollama:${pegaOllamaClient.resolveEmbedModel(model)}`,
+        },
+  llamacpp: () => ({
+    embed: (inputs, model) => llamaCppProvider.embed(inputs, model),
+    model: () => llamaCppProvider.resolveEmbedModel(),
+  }),
+};
+
+// Max inputs per embedding request. Inputs are sorted by length before being
+// split so each request carries similarly sized texts (less padding work on
+// local models); up to EMBED_BATCH_CONCURRENCY requests run at once and
+// results are scattered back to the caller's order.
+const EMBED_BATCH_SIZE = 64;
+const EMBED_BATCH_CONCURRENCY = 4;
+
+// In-memory LRU of embeddings keyed by provider, model and text hash, so
+// re-scanned or re-asked content is not sent to the provider again. Vectors
+// are stored as float32 (~4 KB per 1024-d entry).
+const EMBED_CACHE_MAX_ENTRIES = 5000;
+const embeddingCache = new Map<string, Float32Array>();
+
+function embeddingCacheKey(provider: ProviderName, model: string, text: string): string {
+  const digest = createHash("sha1").update(text).digest("hex");
+  return `${provider}\u0000${model}\u0000${digest}`;
+}
+
+function getCachedEmbedding(key: string): Float32Array | undefined {
+  const hit = embeddingCache.get(key);
+  if (hit) {
+    // Refresh recency
+    embeddingCache.delete(key);
+    embeddingCache.set(key, hit);
   }
-  if (provider === "openrouter") {
-    return embedWithOpenRouter(inputs, overrideModel);
+  return hit;
+}
+
+function setCachedEmbedding(key: string, vector: ArrayLike<number>): void {
+  embeddingCache.delete(key);
+  embeddingCache.set(key, Float32Array.from(vector));
+  if (embeddingCache.size > EMBED_CACHE_MAX_ENTRIES) {
+    const oldest = embeddingCache.keys().next().value;
+    if (oldest !== undefined) embeddingCache.delete(oldest);
   }
-  if (provider === "bailian") {
-    return embedWithBailian(inputs, overrideModel);
+}
+
+/**
+ * Embed inputs in concurrent length-sorted batches, handing each batch's
+ * vectors to `onBatch` together with the original input indices they belong to.
+ * Cached embeddings are delivered first; only misses reach the provider.
+ */
+async function embedInBatches(
+  inputs: string[],
+  overrideModel: string | undefined,
+  onBatch: (indices: number[], vectors: ArrayLike<number>[]) => void
+): Promise<void> {
+  const provider = getActiveProvider();
+  const route = EMBED_DISPATCH[provider]();
+  const modelKey = route.model(overrideModel);
+  const keys = inputs.map((text) => embeddingCacheKey(provider, modelKey, text));
+
+  const hitIndices: number[] = [];
+  const hitVectors: Float32Array[] = [];
+  const missing: number[] = [];
+  keys.forEach((key, i) => {
+    const cached = getCachedEmbedding(key);
+    if (cached) {
+      hitIndices.push(i);
+      hitVectors.push(cached);
+    } else {
+      missing.push(i);
+    }
+  });
+  if (hitIndices.length > 0) {
+    onBatch(hitIndices, hitVectors);
   }
-  if (provider === "pega") {
-    return getPegaMode() === "openrouter"
-      ? embedWithPegaOpenRouter(inputs, overrideModel)
-      : pegaOllamaClient.embed(inputs, overrideModel);
+  if (missing.length === 0) return;
+
+  const embed = route.embed;
+  const order =
+    missing.length <= EMBED_BATCH_SIZE
+      ? missing
+      : missing.slice().sort((a, b) => inputs[a].length - inputs[b].length);
+  const slices: number[][] = [];
+  for (let start = 0; start < order.length; start += EMBED_BATCH_SIZE) {
+    slices.push(order.slice(start, start + EMBED_BATCH_SIZE));
   }
-  if (provider === "llamacpp") {
-    return llamaCppProvider.embed(inputs, overrideModel);
+  await mapWithConcurrency(slices, EMBED_BATCH_CONCURRENCY, async (slice) => {
+    const vectors = await embed(slice.map((i) => inputs[i]), overrideModel);
+    if (vectors.length !== slice.length) {
+      throw new Error(`Embedding count mismatch: expected ${slice.length}, got ${vectors.length}`);
+    }
+    slice.forEach((origIndex, j) => setCachedEmbedding(keys[origIndex], vectors[j]));
+    onBatch(slice, vectors);
+  });
+}
+
+export async function embedText(inputs: string[], overrideModel?: string): Promise<number[][]> {
+  if (inputs.length === 0) return [];
+  const results: number[][] = new Array(inputs.length);
+  await embedInBatches(inputs, overrideModel, (indices, vectors) => {
+    indices.forEach((origIndex, j) => {
+      const vector = vectors[j];
+      results[origIndex] = Array.isArray(vector) ? vector : Array.from(vector);
+    });
+  });
+  return results;
+}
+
+// Single-text embeds (e.g. chat questions) arriving within this window are
+// coalesced into one embedText() call so concurrent requests share a
+// provider round trip.
+const EMBED_COALESCE_WINDOW_MS = 5;
+
+interface PendingEmbed {
+  text: string;
+  resolve: (vector: number[]) => void;
+  reject: (error: unknown) => void;
+}
+
+// Keyed by override model ("" = active provider default)
+const pendingEmbeds = new Map<string, PendingEmbed[]>();
+
+async function flushPendingEmbeds(modelKey: string): Promise<void> {
+  const queue = pendingEmbeds.get(modelKey) ?? [];
+  pendingEmbeds.delete(modelKey);
+  if (queue.length === 0) return;
+  try {
+    const vectors = await embedText(queue.map((p) => p.text), modelKey || undefined);
+    queue.forEach((p, i) => p.resolve(vectors[i] ?? []));
+  } catch (error) {
+    queue.forEach((p) => p.reject(error));
   }
-  return ollamaClient.embed(inputs, overrideModel);
+}
+
+export function embedSingleText(text: string, overrideModel?: string): Promise<number[]> {
+  const modelKey = overrideModel || "";
+  return new Promise((resolve, reject) => {
+    let queue = pendingEmbeds.get(modelKey);
+    if (!queue) {
+      queue = [];
+      pendingEmbeds.set(modelKey, queue);
+      setTimeout(() => void flushPendingEmbeds(modelKey), EMBED_COALESCE_WINDOW_MS);
+    }
+    queue.push({ text, resolve, reject });
+  });
+}
+
+/**
+ * Embed inputs straight into one preallocated row-major Float32Array
+ * (row i = inputs[i]), so large batches never hold a number[][] copy of
+ * every vector.
+ */
+export async function embedTextToMatrix(
+  inputs: string[],
+  overrideModel?: string
+): Promise<{ matrix: Float32Array; dim: number }> {
+  if (inputs.length === 0) return { matrix: new Float32Array(0), dim: 0 };
+  let matrix = new Float32Array(0);
+  let dim = 0;
+  await embedInBatches(inputs, overrideModel, (indices, vectors) => {
+    if (dim === 0) {
+      dim = vectors[0]?.length ?? 0;
+      matrix = new Float32Array(inputs.length * dim);
+    }
+    indices.forEach((origIndex, j) => {
+      const row = vectors[j];
+      if (row.length !== dim) {
+        throw new Error(`Embedding dimension mismatch: expected ${dim}, got ${row.length}`);
+      }
+      matrix.set(row, origIndex * dim);
+    });
+  });
+  return { matrix, dim };
+}
+
+// Low-temperature structured calls (tagging, classification) are close to
+// deterministic, so identical requests within the TTL are answered from
+// memory instead of hitting the provider again.
+const STRUCTURED_CACHE_MAX_TEMPERATURE = 0.2;
+const STRUCTURED_CACHE_MAX_ENTRIES = 256;
+const STRUCTURED_CACHE_TTL_MS = 10 * 60 * 1000;
+const structuredJsonCache = new Map<string, { value: unknown; expiresAt: number }>();
+// Cacheable requests currently awaiting the provider, so identical concurrent
+// calls (e.g. during a re-scan) share one round trip
+const inflightStructuredJson = new Map<string, Promise<unknown>>();
+
+function structuredJsonCacheKey(
+  provider: ProviderName,
+  messages: LlmMessage[],
+  responseFormat: StructuredResponseFormat | undefined,
+  temperature: number,
+  tokenBudget: number,
+  overrideModel: string,
+  lang: SupportedLang | undefined
+): string {
+  const model = overrideModel || getActiveModelName("chat", provider);
+  const material = JSON.stringify([provider, model, messages, responseFormat ?? null, temperature, tokenBudget, lang ?? ""]);
+  return createHash("sha256").update(material).digest("hex");
 }
 
 export async function generateStructuredJson(
@@ -155,89 +363,108 @@ export async function generateStructuredJson(
   console.log(`generateStructuredJson called with provider: ${provider}`);
   const tokenBudget = Math.max(maxTokens, MIN_JSON_COMPLETION_TOKENS);
 
-  if (provider === "openai" || provider === "azure-openai") {
-    // Map to OpenAI message format (string content only)
-    const oaMessages = messages.map((m) => ({ role: m.role, content: m.content }));
-    const schema = responseFormat?.json_schema?.schema as Record<string, unknown> | undefined;
-    return generateStructuredJsonWithOpenAI(oaMessages, schema, temperature, tokenBudget, overrideModel || undefined);
+  if (temperature > STRUCTURED_CACHE_MAX_TEMPERATURE) {
+    return dispatchStructuredJson(provider, { messages, responseFormat, temperature, tokenBudget, overrideModel, lang });
   }
-  if (provider === "openrouter") {
-    const oaMessages = messages.map((m) => ({ role: m.role, content: m.content }));
-    const schema = responseFormat?.json_schema?.schema as Record<string, unknown> | undefined;
-    return generateStructuredJsonWithOpenRouter(oaMessages, schema, temperature, tokenBudget, overrideModel || undefined);
+
+  const key = structuredJsonCacheKey(provider, messages, responseFormat, temperature, tokenBudget, overrideModel, lang);
+  const hit = structuredJsonCache.get(key);
+  if (hit && hit.expiresAt > Date.now()) {
+    // Refresh recency; hand out a copy so callers cannot mutate the cached value
+    structuredJsonCache.delete(key);
+    structuredJsonCache.set(key, hit);
+    return structuredClone(hit.value);
   }
-  if (provider === "bailian") {
-    const oaMessages = messages.map((m) => ({ role: m.role, content: m.content }));
-    const schema = responseFormat?.json_schema?.schema as Record<string, unknown> | undefined;
-    return generateStructuredJsonWithBailian(oaMessages, schema, temperature, tokenBudget, overrideModel || undefined);
+
+  const pending = inflightStructuredJson.get(key);
+  if (pending) {
+    return structuredClone(await pending);
   }
-  if (provider === "pega") {
-    if (getPegaMode() === "openrouter") {
-      const oaMessages: ChatCompletionMessageParam[] = messages.map((m) => ({ role: m.role, content: m.content }));
-      const schema = responseFormat?.json_schema?.schema as Record<string, unknown> | undefined;
-      return generateStructuredJsonWithPegaOpenRouter(
-        oaMessages,
-        schema,
-        temperature,
-        tokenBudget,
-        overrideModel || undefined
-      );
-    }
-    return pegaOllamaClient.generateStructuredJson(
-      messages,
-      responseFormat,
-      temperature,
-      tokenBudget,
-      overrideModel,
-      lang
-    );
+
+  const request = dispatchStructuredJson(provider, { messages, responseFormat, temperature, tokenBudget, overrideModel, lang });
+  inflightStructuredJson.set(key, request);
+  let value: unknown;
+  try {
+    value = await request;
+  } finally {
+    inflightStructuredJson.delete(key);
   }
-  if (provider === "llamacpp") {
-    const oaMessages: ChatCompletionMessageParam[] = messages.map((m) => ({ role: m.role, content: m.content }));
-    return llamaCppProvider.generateStructuredJson({
-      messages: oaMessages,
-      responseFormat,
-      temperature,
-      maxTokens: tokenBudget,
-      overrideModel: overrideModel || undefined,
-      language: lang,
-    });
+  structuredJsonCache.delete(key);
+  structuredJsonCache.set(key, { value: structuredClone(value), expiresAt: Date.now() + STRUCTURED_CACHE_TTL_MS });
+  if (structuredJsonCache.size > STRUCTURED_CACHE_MAX_ENTRIES) {
+    const oldest = structuredJsonCache.keys().next().value;
+    if (oldest !== undefined) structuredJsonCache.delete(oldest);
   }
-  return ollamaClient.generateStructuredJson(
-    messages,
-    responseFormat,
-    temperature,
-    tokenBudget,
-    overrideModel,
-    lang
-  );
+  return value;
 }
 
-export async function describeImage(
-  imageBase64: string | string[],
+interface StructuredJsonCall {
+  messages: LlmMessage[];
+  responseFormat?: StructuredResponseFormat;
+  temperature: number;
+  tokenBudget: number;
+  overrideModel: string;
+  lang?: SupportedLang;
+}
+
+type StructuredJsonFn = (call: StructuredJsonCall) => Promise<unknown>;
+
+// OpenAI-style providers take string-content chat messages plus a bare schema
+function toChatMessages(messages: LlmMessage[]): ChatCompletionMessageParam[] {
+  const chatMessages: ChatCompletionMessageParam[] = messages.map((m) => ({ role: m.role, content: m.content }));
+  return chatMessages;
+}
+
+function schemaOf(responseFormat?: StructuredResponseFormat): Record<string, unknown> | undefined {
+  return responseFormat?.json_schema?.schema as Record<string, unknown> | undefined;
+}
+
+const structuredWithOpenAI: StructuredJsonFn = (c) =>
+  generateStructuredJsonWithOpenAI(toChatMessages(c.messages), schemaOf(c.responseFormat), c.temperature, c.tokenBudget, c.overrideModel || undefined);
+
+// Structured-output entry point per provider
+const STRUCTURED_DISPATCH: Record<ProviderName, StructuredJsonFn> = {
+  ollama: (c) =>
+    ollamaClient.generateStructuredJson(c.messages, c.responseFormat, c.temperature, c.tokenBudget, c.overrideModel, c.lang),
+  openai: structuredWithOpenAI,
+  "azure-openai": structuredWithOpenAI,
+  openrouter: (c) =>
+    generateStructuredJsonWithOpenRouter(toChatMessages(c.messages), schemaOf(c.responseFormat), c.temperature, c.tokenBudget, c.overrideModel || undefined),
+  bailian: (c) =>
+    generateStructuredJsonWithBailian(c.messages, schemaOf(c.responseFormat), c.temperature, c.tokenBudget, c.overrideModel || undefined),
+  pega: (c) =>
+    getPegaMode() === "openrouter"
+      ? generateStructuredJsonWithPegaOpenRouter(toChatMessages(c.messages), schemaOf(c.responseFormat), c.temperature, c.tokenBudget, c.overrideModel || undefined)
+      : pegaOllamaClient.generateStructuredJson(c.messages, c.responseFormat, c.temperature, c.tokenBudget, c.overrideModel, c.lang),
+  llamacpp: (c) =>
+    llamaCppProvider.generateStructuredJson({
+      messages: toChatMessages(c.messages),
+      responseFormat: c.responseFormat,
+      temperature: c.temperature,
+      maxTokens: c.tokenBudget,
+      overrideModel: c.overrideModel || undefined,
+      language: c.lang,
+    }),
+};
+
+function dispatchStructuredJson(provider: ProviderName, call: StructuredJsonCall): Promise<unknown> {
+  return (STRUCTURED_DISPATCH[provider] ?? STRUCTURED_DISPATCH.ollama)(call);
+}
+
+interface DescribeImageCall {
+  images: string[];
   options?: {
     prompt?: string;
     overrideModel?: string;
     timeoutMs?: number;
     maxTokens?: number;
-    providerOverride?: ProviderName;
-  }
-): Promise<string> {
-  const provider = options?.providerOverride || getActiveProvider();
-  if (provider === "openai" || provider === "azure-openai") {
-    const img = Array.isArray(imageBase64) ? imageBase64[0] : imageBase64;
-    return describeImageWithOpenAI(img, options?.prompt, options?.overrideModel, options?.maxTokens);
-  }
-  if (provider === "openrouter") {
-    const img = Array.isArray(imageBase64) ? imageBase64[0] : imageBase64;
-    return describeImageWithOpenRouter(img, options?.prompt, options?.overrideModel, options?.maxTokens);
-  }
-  if (provider === "bailian") {
-    const img = Array.isArray(imageBase64) ? imageBase64[0] : imageBase64;
-    return describeImageWithBailian(img, options?.prompt, options?.overrideModel, options?.timeoutMs, options?.maxTokens);
-  }
-  const imgs = Array.isArray(imageBase64) ? imageBase64 : [imageBase64];
-  const describeOptions: DescribeImageOptions | undefined = options
+  };
+}
+
+type DescribeImageFn = (call: DescribeImageCall) => Promise<string>;
+
+function toDescribeOptions(options: DescribeImageCall["options"]): DescribeImageOptions | undefined {
+  return options
     ? {
         prompt: options.prompt,
         overrideModel: options.overrideModel,
@@ -245,20 +472,38 @@ export async function describeImage(
         maxTokens: options.maxTokens,
       }
     : undefined;
-  if (provider === "pega") {
-    if (getPegaMode() === "openrouter") {
-      const img = imgs[0];
-      return describeImageWithPegaOpenRouter(
-        img,
-        options?.prompt,
-        options?.overrideModel,
-        options?.maxTokens
-      );
-    }
-    return pegaOllamaClient.describeImage(imgs, describeOptions);
-  }
-  if (provider === "llamacpp") {
-    return llamaCppProvider.describeImage(imgs, describeOptions);
+}
+
+const describeWithOpenAI: DescribeImageFn = ({ images, options }) =>
+  describeImageWithOpenAI(images[0], options?.prompt, options?.overrideModel, options?.maxTokens);
+
+// Vision entry point per provider; cloud providers describe the first image only
+const DESCRIBE_DISPATCH: Record<ProviderName, DescribeImageFn> = {
+  ollama: ({ images, options }) => ollamaClient.describeImage(images, toDescribeOptions(options)),
+  openai: describeWithOpenAI,
+  "azure-openai": describeWithOpenAI,
+  openrouter: ({ images, options }) =>
+    describeImageWithOpenRouter(images[0], options?.prompt, options?.overrideModel, options?.maxTokens),
+  bailian: ({ images, options }) =>
+    describeImageWithBailian(images[0], options?.prompt, options?.overrideModel, options?.timeoutMs, options?.maxTokens),
+  pega: ({ images, options }) =>
+    getPegaMode() === "openrouter"
+      ? describeImageWithPegaOpenRouter(images[0], options?.prompt, options?.overrideModel, options?.maxTokens)
+      : pegaOllamaClient.describeImage(images, toDescribeOptions(options)),
+  llamacpp: ({ images, options }) => llamaCppProvider.describeImage(images, toDescribeOptions(options)),
+};
+
+export async function describeImage(
+  imageBase64: string | string[],
+  options?: {
+    prompt?: string;
+    overrideModel?: string;
+    timeoutMs?: number;
+    maxTokens?: number;
+    providerOverride?: ProviderName;
   }
-  return ollamaClient.describeImage(imgs, describeOptions);
+): Promise<string> {
+  const provider = options?.providerOverride || getActiveProvider();
+  const images = Array.isArray(imageBase64) ? imageBase64 : [imageBase64];
+  return (DESCRIBE_DISPATCH[provider] ?? DESCRIBE_DISPATCH.ollama)({ images, options });
 }
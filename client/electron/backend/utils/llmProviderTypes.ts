@@ -8,6 +8,9 @@ import type { SupportedLang } from "./promptHelper";
 /** Minimum completion tokens to keep JSON outputs intact */
 export const MIN_JSON_COMPLETION_TOKENS = 3072;
 
+/** Outermost JSON object/array in free-form model output (fallback parsing) */
+export const JSON_BLOCK_RE = /\{[\s\S]*\}|\[[\s\S]*\]/;
+
 /**
  * Unified configuration structure resolved from AppConfig
  */
@@ -9,6 +9,9 @@ import fs from "fs";
  * - Production: use path.dirname(app.getPath('exe'))/temp (writeable next to exe)
  * Ensures the directory exists and returns its absolute path.
  */
+// Temp directory already created in this process; later calls skip the mkdir
+let ensuredTempDir: string | null = null;
+
 export async function ensureTempDir(): Promise<string> {
   let baseDir: string;
   if (app.isPackaged === false) {
@@ -21,7 +24,9 @@ export async function ensureTempDir(): Promise<string> {
   }
 
   const tempDir = path.join(baseDir, "temp");
+  if (tempDir === ensuredTempDir) return tempDir;
   await fsp.mkdir(tempDir, { recursive: true });
+  ensuredTempDir = tempDir;
   return tempDir;
 }
 
@@ -6,7 +6,7 @@ import type {
 } from "openai/resources/chat/completions";
 import { httpPostJson } from "./httpClient";
 import { normalizeJsonSchema } from "./openrouter";
-import { MIN_JSON_COMPLETION_TOKENS } from "./llmProviderTypes";
+import { MIN_JSON_COMPLETION_TOKENS, JSON_BLOCK_RE } from "./llmProviderTypes";
 
 interface PegaOpenRouterEmbedResponse { embeddings: number[][] }
 
@@ -183,6 +183,14 @@ async function postPegaOpenRouterJson<T>(
   }
 }
 
+/** Model embedWithPegaOpenRouter() will send; empty when none is configured */
+export function resolvePegaOpenRouterEmbedModel(
+  overrideModel?: string,
+  resolved: PegaOpenRouterResolvedConfig = resolvePegaOpenRouterConfig()
+): string {
+  return overrideModel || resolved.embedModel || resolved.chatModel || "";
+}
+
 export async function embedWithPegaOpenRouter(
   inputs: string[] | string,
   overrideModel?: string
@@ -192,7 +200,7 @@ export async function embedWithPegaOpenRouter(
     return [];
   }
   const resolved = resolvePegaOpenRouterConfig();
-  const model = overrideModel || resolved.embedModel || resolved.chatModel;
+  const model = resolvePegaOpenRouterEmbedModel(overrideModel, resolved);
   if (!model) {
     throw new Error("Pega embedding model not configured");
   }
@@ -269,7 +277,7 @@ export async function generateStructuredJsonWithPegaOpenRouter(
     try {
       return JSON.parse(text);
     } catch {
-      const match = text.match(/\{[\s\S]*\}|\[[\s\S]*\]/);
+      const match = text.match(JSON_BLOCK_RE);
       if (match) {
         return JSON.parse(match[0]);
       }
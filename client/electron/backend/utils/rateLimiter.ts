@@ -0,0 +1,40 @@
+/**
+ * Token-bucket limiter for outbound provider requests.
+ * Tokens refill continuously at `ratePerSecond` up to `capacity` (the burst
+ * size). A caller that finds the bucket empty sleeps only for its own refill
+ * time and then re-checks, so waiters never block each other and concurrent
+ * callers proceed as fast as the rate allows.
+ */
+export class RateLimiter {
+  private readonly ratePerSecond: number;
+  private readonly capacity: number;
+  private tokens: number;
+  private lastRefill: number;
+
+  constructor(ratePerSecond: number, capacity: number) {
+    this.ratePerSecond = Math.max(ratePerSecond, Number.EPSILON);
+    this.capacity = Math.max(1, capacity);
+    this.tokens = this.capacity;
+    this.lastRefill = Date.now();
+  }
+
+  private refill(now: number): void {
+    const elapsedSec = (now - this.lastRefill) / 1000;
+    if (elapsedSec > 0) {
+      this.tokens = Math.min(this.capacity, this.tokens + elapsedSec * this.ratePerSecond);
+      this.lastRefill = now;
+    }
+  }
+
+  async acquire(): Promise<void> {
+    for (;;) {
+      this.refill(Date.now());
+      if (this.tokens >= 1) {
+        this.tokens -= 1;
+        return;
+      }
+      const waitMs = Math.ceil(((1 - this.tokens) / this.ratePerSecond) * 1000);
+      await new Promise((resolve) => setTimeout(resolve, waitMs));
+    }
+  }
+}
@@ -0,0 +1,133 @@
+// Vector math helpers for in-process similarity scoring.
+// Embeddings are kept as float32: providers return float32-precision values,
+// and half-width storage halves the memory traffic of every scan. Single
+// query vectors may be plain number arrays, so callers need not convert them.
+
+/**
+ * Squared L2 distance of one query vector to every row of a packed matrix,
+ * matching FAISS IndexFlatL2 distances. The query's squared norm is computed
+ * once; each row's dot product and squared norm are accumulated together in a
+ * single pass and combined as |q|^2 + |r|^2 - 2 * dot.
+ */
+export function squaredL2DistanceBatch(query: ArrayLike<number>, matrix: Float32Array, dim: number): Float32Array {
+  let qNormSq = 0;
+  for (let j = 0; j < dim; j++) qNormSq += query[j] * query[j];
+
+  const count = Math.floor(matrix.length / dim);
+  const distances = new Float32Array(count);
+  for (let i = 0; i < count; i++) {
+    const offset = i * dim;
+    // Four independent accumulators let the JIT overlap the multiply-adds
+    // (there is no portable SIMD in JS)
+    let d0 = 0, d1 = 0, d2 = 0, d3 = 0;
+    let n0 = 0, n1 = 0, n2 = 0, n3 = 0;
+    let j = 0;
+    for (; j + 4 <= dim; j += 4) {
+      const v0 = matrix[offset + j];
+      const v1 = matrix[offset + j + 1];
+      const v2 = matrix[offset + j + 2];
+      const v3 = matrix[offset + j + 3];
+      d0 += query[j] * v0;
+      d1 += query[j + 1] * v1;
+      d2 += query[j + 2] * v2;
+      d3 += query[j + 3] * v3;
+      n0 += v0 * v0;
+      n1 += v1 * v1;
+      n2 += v2 * v2;
+      n3 += v3 * v3;
+    }
+    for (; j < dim; j++) {
+      const v = matrix[offset + j];
+      d0 += query[j] * v;
+      n0 += v * v;
+    }
+    const dot = d0 + d1 + d2 + d3;
+    const rNormSq = n0 + n1 + n2 + n3;
+    // Rounding can push near-identical vectors slightly below zero
+    distances[i] = Math.max(0, qNormSq + rNormSq - 2 * dot);
+  }
+  return distances;
+}
+
+/**
+ * Whether every vector in the sample rows has (approximately) unit L2 norm.
+ * Providers such as Ollama's /api/embed and OpenAI return normalized
+ * embeddings, for which squared L2 distance reduces to 2 - 2 * dot product.
+ */
+export function isUnitNormalized(matrix: ArrayLike<number>, dim: number, sampleRows = 8, tolerance = 1e-3): boolean {
+  const count = Math.floor(matrix.length / dim);
+  const step = Math.max(1, Math.floor(count / sampleRows));
+  for (let i = 0; i < count; i += step) {
+    const offset = i * dim;
+    let normSq = 0;
+    for (let j = 0; j < dim; j++) normSq += matrix[offset + j] * matrix[offset + j];
+    if (Math.abs(normSq - 1) > tolerance) return false;
+  }
+  return count > 0;
+}
+
+/**
+ * Dot product of one query vector against every row of a packed matrix.
+ * Equals cosine similarity when both sides are unit-normalized.
+ */
+export function dotProductBatch(query: ArrayLike<number>, matrix: Float32Array, dim: number): Float32Array {
+  const count = Math.floor(matrix.length / dim);
+  const scores = new Float32Array(count);
+  for (let i = 0; i < count; i++) {
+    const offset = i * dim;
+    let d0 = 0, d1 = 0, d2 = 0, d3 = 0;
+    let j = 0;
+    for (; j + 4 <= dim; j += 4) {
+      d0 += query[j] * matrix[offset + j];
+      d1 += query[j + 1] * matrix[offset + j + 1];
+      d2 += query[j + 2] * matrix[offset + j + 2];
+      d3 += query[j + 3] * matrix[offset + j + 3];
+    }
+    for (; j < dim; j++) d0 += query[j] * matrix[offset + j];
+    scores[i] = d0 + d1 + d2 + d3;
+  }
+  return scores;
+}
+
+/**
+ * Indices of the k highest scores, best first. Keeps a size-k min-heap while
+ * scanning, so selection costs O(n log k) instead of sorting every score.
+ */
+export function topKIndices(scores: ArrayLike<number>, k: number): number[] {
+  const limit = Math.max(0, Math.min(Math.floor(k), scores.length));
+  if (limit === 0) return [];
+
+  const heap: number[] = [];
+  const less = (a: number, b: number) => scores[a] < scores[b];
+  const siftUp = (pos: number) => {
+    while (pos > 0) {
+      const parent = (pos - 1) >> 1;
+      if (!less(heap[pos], heap[parent])) break;
+      [heap[pos], heap[parent]] = [heap[parent], heap[pos]];
+      pos = parent;
+    }
+  };
+  const siftDown = (pos: number) => {
+    for (;;) {
+      const left = pos * 2 + 1;
+      const right = left + 1;
+      let smallest = pos;
+      if (left < heap.length && less(heap[left], heap[smallest])) smallest = left;
+      if (right < heap.length && less(heap[right], heap[smallest])) smallest = right;
+      if (smallest === pos) break;
+      [heap[pos], heap[smallest]] = [heap[smallest], heap[pos]];
+      pos = smallest;
+    }
+  };
+
+  for (let i = 0; i < scores.length; i++) {
+    if (heap.length < limit) {
+      heap.push(i);
+      siftUp(heap.length - 1);
+    } else if (scores[i] > scores[heap[0]]) {
+      heap[0] = i;
+      siftDown(0);
+    }
+  }
+  return heap.sort((a, b) => scores[b] - scores[a]);
+}
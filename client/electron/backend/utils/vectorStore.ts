@@ -6,12 +6,18 @@ import { logger } from "../../logger";
 import { configManager } from "../../configManager";
 
 
+// Directory already ensured in this process; skips a stat on every lookup
+let ensuredRagDir: string | null = null;
+
 export function getRagDir(): string {
   // Store alongside sqlite DB by default
   const base = path.dirname(configManager.getDatabaseAbsolutePath());
   const dir = path.join(base, "vectors");
+  if (dir === ensuredRagDir) return dir;
   try {
-    if (!fs.existsSync(dir)) fs.mkdirSync(dir, { recursive: true });
+    // recursive mkdir is a no-op when the directory exists
+    fs.mkdirSync(dir, { recursive: true });
+    ensuredRagDir = dir;
   } catch (e) {
     logger.warn("Failed to ensure RAG vectors directory", e as unknown);
   }
@@ -36,32 +42,79 @@ export async function globalIndexExists(): Promise<boolean> {
   }
 }
 
+interface LoadedGlobalIndex {
+  path: string;
+  mtimeMs: number;
+  size: number;
+  index: faiss.Index;
+  labels: number[];
+}
+
+// Global index kept in memory between searches; reloaded from disk only when
+// the index file's mtime or size changes (or after an update in this process).
+let loadedGlobalIndex: LoadedGlobalIndex | null = null;
+
+async function rememberGlobalIndex(indexPath: string, index: faiss.Index, labels: number[]): Promise<void> {
+  try {
+    const st = await fsp.stat(indexPath);
+    loadedGlobalIndex = { path: indexPath, mtimeMs: st.mtimeMs, size: st.size, index, labels };
+  } catch {
+    loadedGlobalIndex = null;
+  }
+}
+
+// FAISS METRIC_L2
+const FAISS_METRIC_L2 = 1;
+
+/**
+ * Create an empty L2 index for the global store. Vectors are stored with a
+ * half-precision scalar quantizer (SQfp16), which halves memory and file size
+ * compared to a flat float32 index and needs no training step. Falls back to
+ * IndexFlatL2 when the factory API is unavailable. Existing index files are
+ * read as-is, whatever their type.
+ */
+function createGlobalIndex(dim: number): faiss.Index {
+  const api = faiss as unknown as {
+    Index: { fromFactory?: (d: number, descriptor: string, metric?: number) => faiss.Index };
+    IndexFlatL2: new (d: number) => faiss.Index;
+  };
+  if (typeof api.Index?.fromFactory === "function") {
+    try {
+      return api.Index.fromFactory(dim, "SQfp16", FAISS_METRIC_L2);
+    } catch (e) {
+      logger.warn("Failed to create SQfp16 FAISS index; falling back to IndexFlatL2", e as unknown);
+    }
+  }
+  return new api.IndexFlatL2(dim);
+}
+
 export async function updateGlobalFaissIndex(params: {
   addIds: number[];
-  vectors: number[][];
+  /** Row-major vectors for addIds, `dim` floats per row. */
+  matrix?: Float32Array;
+  dim?: number;
   removeIds?: number[];
 }): Promise<{ path: string; dim: number; addCount: number; removed?: number }>{
-  const { addIds, vectors } = params;
+  const { addIds } = params;
+  const matrix = params.matrix ?? new Float32Array(0);
+  const dim = params.dim ?? 0;
   const removeIds = Array.isArray(params.removeIds) ? Array.from(new Set(params.removeIds)) : [];
 
   if (!isFaissAvailable()) {
     throw new Error("FAISS is not available in this runtime");
   }
-  if (!Array.isArray(addIds) || !Array.isArray(vectors) || addIds.length !== vectors.length) {
-    throw new Error("addIds and vectors must be arrays of equal length");
+  if (!Array.isArray(addIds)) {
+    throw new Error("addIds must be an array");
   }
   if (addIds.length === 0 && removeIds.length === 0) {
     return { path: getGlobalIndexPath(), dim: 0, addCount: 0, removed: 0 };
   }
 
   // Validate vector dimensions
-  const dim = vectors[0]?.length ?? 0;
   if (addIds.length > 0) {
     if (!Number.isInteger(dim) || dim <= 0) throw new Error("Vectors must be non-empty with consistent dimensions");
-    for (let i = 0; i < vectors.length; i++) {
-      if (!Array.isArray(vectors[i]) || vectors[i].length !== dim) {
-        throw new Error(`Vector at index ${i} has invalid dimension`);
-      }
+    if (matrix.length !== addIds.length * dim) {
+      throw new Error(`Vector matrix has ${matrix.length} values, expected ${addIds.length} x ${dim}`);
     }
   }
 
@@ -103,16 +156,14 @@ export async function updateGlobalFaissIndex(params: {
       meta = { version: 1, dim: existDim, labels: Array.from({ length: ntotal }, (_, i) => i) };
     }
   } else {
-    // Create new IndexFlatL2
+    // Create new index
     if (dim <= 0) throw new Error("Cannot create index: missing vector dimension");
     try {
-      // Use L2 flat index by default
-      const { IndexFlatL2 } = faiss as unknown as { IndexFlatL2: new (d: number) => faiss.Index };
-      index = new IndexFlatL2(dim);
+      index = createGlobalIndex(dim);
       meta = { version: 1, dim, labels: [] };
     } catch (e) {
-      logger.error("Failed to create FAISS IndexFlatL2", e as unknown);
-      throw new Error("Failed to create FAISS IndexFlatL2");
+      logger.error("Failed to create FAISS index", e as unknown);
+      throw new Error("Failed to create FAISS index");
     }
   }
 
@@ -143,14 +194,9 @@ export async function updateGlobalFaissIndex(params: {
 
   // Add new vectors
   if (addIds.length > 0) {
-    // Flatten vectors row-major
-    const flat: number[] = new Array(addIds.length * dim);
-    for (let i = 0; i < addIds.length; i++) {
-      const row = vectors[i]!;
-      for (let d = 0; d < dim; d++) flat[i * dim + d] = row[d]!;
-    }
     try {
-      index.add(flat);
+      // faiss-node takes a plain array; the matrix is already row-major
+      index.add(Array.from(matrix));
       // Append external chunk IDs in the same order; labels are assigned sequentially
       for (let i = 0; i < addIds.length; i++) meta.labels.push(addIds[i]!);
     } catch (e) {
@@ -160,6 +206,7 @@ export async function updateGlobalFaissIndex(params: {
   }
 
   // Persist index and metadata
+  loadedGlobalIndex = null;
   try {
     index.write(indexPath);
   } catch (e) {
@@ -174,6 +221,7 @@ export async function updateGlobalFaissIndex(params: {
     throw new Error("Failed to persist FAISS metadata");
   }
 
+  await rememberGlobalIndex(indexPath, index, meta.labels);
   logger.info("Updated global FAISS index", { path: indexPath, dim: meta.dim, addCount: addIds.length, removed: removedCount, total: meta.labels.length });
   return { path: indexPath, dim: meta.dim, addCount: addIds.length, removed: removedCount };
 }
@@ -194,19 +242,43 @@ export async function searchGlobalFaissIndex(params: {
   const metaPath = path.join(getRagDir(), "faiss_index.meta.json");
 
   // If index missing, return empty
-  if (!(await globalIndexExists())) {
-    logger.warn("FAISS index not found when searching", { indexPath });
+  let st: fs.Stats;
+  try {
+    st = await fsp.stat(indexPath);
+  } catch {
+    // Expected until the first document is imported
+    logger.debug("FAISS index not found when searching", { indexPath });
     return { ids: [], distances: [], dim: 0 };
   }
 
-  // Read index
-  let index: faiss.Index;
-  try {
-    index = faiss.Index.read(indexPath);
-  } catch (e) {
-    logger.error("Failed to read FAISS index for search", e as unknown);
-    return { ids: [], distances: [], dim: 0 };
+  let loaded = loadedGlobalIndex;
+  if (!loaded || loaded.path !== indexPath || loaded.mtimeMs !== st.mtimeMs || loaded.size !== st.size) {
+    // Read index
+    let index: faiss.Index;
+    try {
+      index = faiss.Index.read(indexPath);
+    } catch (e) {
+      logger.error("Failed to read FAISS index for search", e as unknown);
+      return { ids: [], distances: [], dim: 0 };
+    }
+
+    // Load meta mapping
+    let labels: number[] = [];
+    try {
+      const raw = await fsp.readFile(metaPath, "utf-8");
+      const meta = JSON.parse(raw) as { labels: number[] };
+      if (Array.isArray(meta.labels)) labels = meta.labels;
+    } catch (e) {
+      logger.warn("Failed to read FAISS metadata; falling back to identity labels", e as unknown);
+    }
+    if (labels.length !== index.ntotal()) {
+      // Identity fallback
+      labels = Array.from({ length: index.ntotal() }, (_, i) => i);
+    }
+    loaded = { path: indexPath, mtimeMs: st.mtimeMs, size: st.size, index, labels };
+    loadedGlobalIndex = loaded;
   }
+  const { index, labels: labelsMap } = loaded;
 
   const dim = index.getDimension();
   if (!Array.isArray(query) || query.length !== dim) {
@@ -214,20 +286,6 @@ export async function searchGlobalFaissIndex(params: {
     return { ids: [], distances: [], dim };
   }
 
-  // Load meta mapping
-  let labelsMap: number[] = [];
-  try {
-    const raw = await fsp.readFile(metaPath, "utf-8");
-    const meta = JSON.parse(raw) as { labels: number[] };
-    if (Array.isArray(meta.labels)) labelsMap = meta.labels;
-  } catch (e) {
-    logger.warn("Failed to read FAISS metadata; falling back to identity labels", e as unknown);
-  }
-  if (labelsMap.length !== index.ntotal()) {
-    // Identity fallback
-    labelsMap = Array.from({ length: index.ntotal() }, (_, i) => i);
-  }
-
   const ntotal = index.ntotal();
   const kPrime = Math.min(ntotal, Math.max(k, k * oversample));
   const res = index.search(query, kPrime);
@@ -6,6 +6,7 @@ import { ensureLogsDirSync } from "./backend/utils/pathHelper";
 class Logger {
   private logFilePath: string;
   private initialized: boolean = false;
+  private debugEnabled: boolean | null = null;
 
   constructor() {
     // 延迟初始化，因为在构造函数时 app.getPath 可能不可用
@@ -74,9 +75,24 @@ class Logger {
     this.writeToFile(formattedMessage);
   }
 
-  debug(message: string, ...args: unknown[]) {
-    const formattedMessage = this.formatMessage('DEBUG', message, ...args);
-    console.debug(`[DEBUG] ${message}`, ...args);
+  /**
+   * Debug output is on unless LOG_LEVEL is set to info, warn or error;
+   * resolved once on first use.
+   */
+  isDebugEnabled(): boolean {
+    if (this.debugEnabled === null) {
+      const level = (process.env.LOG_LEVEL || '').toLowerCase();
+      this.debugEnabled = !['info', 'warn', 'error'].includes(level);
+    }
+    return this.debugEnabled;
+  }
+
+  // Pass a function to defer building an expensive message until it is emitted
+  debug(message: string | (() => string), ...args: unknown[]) {
+    if (!this.isDebugEnabled()) return;
+    const text = typeof message === 'function' ? message() : message;
+    const formattedMessage = this.formatMessage('DEBUG', text, ...args);
+    console.debug(`[DEBUG] ${text}`, ...args);
     this.writeToFile(formattedMessage);
   }
 
@@ -101,7 +101,7 @@ const htmlToPlainText = (html: string): string => {
   } catch {
     // fallback handled below
   }
-  return html.replace(/<[^>]*>/g, " ").replace(/\s+/g, " ").trim();
+  return html.replace(/(?:<[^>]*>|\s)+/g, " ").trim();
 };
 
 const extractTextFromPreview = (preview: PreviewResponseData | null | undefined): string => {
@@ -445,10 +445,9 @@ const FileImport = forwardRef<FileImportRef, FileImportProps>(
       if (!trimmed) {
         return "";
       }
+      // One pass: unify separators, collapse runs and drop the trailing one
       return trimmed
-        .replace(/\\/g, "/")
-        .replace(/\/{2,}/g, "/")
-        .replace(/\/+$/g, "")
+        .replace(/[\\/]+/g, (run, offset: number) => (offset + run.length === trimmed.length ? "" : "/"))
         .toLowerCase();
     }, []);
 
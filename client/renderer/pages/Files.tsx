@@ -94,7 +94,7 @@ const htmlToPlainText = (html: string): string => {
   } catch {
     // fall through to regex-based strip
   }
-  return html.replace(/<[^>]*>/g, " ").replace(/\s+/g, " ").trim();
+  return html.replace(/(?:<[^>]*>|\s)+/g, " ").trim();
 };
 
 const extractTextFromPreview = (preview: PreviewResponseData | null | undefined): string => {
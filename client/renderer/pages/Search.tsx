@@ -101,48 +101,52 @@ const SearchPage = () => {
       const fileIds = fileIdsParam.split(",").filter((id) => id && id.trim());
       const loadReferencedFiles = async () => {
         try {
-          const files: SearchResult[] = [];
-          for (const fileId of fileIds) {
-            const normalizedId = fileId?.trim();
-            if (!normalizedId) {
-              continue;
-            }
-
-            try {
-              const response = await apiService.getFileDetail(normalizedId);
-              if (response.success && response.data) {
-                const fileData = response.data as {
-                  id?: string;
-                  file_id?: string;
-                  name: string;
-                  path: string;
-                  type: string;
-                  category: string;
-                  size: number;
-                  created_at: string;
-                  tags?: string[];
-                };
-
-                const actualFileId = fileData.file_id || fileData.id;
-                if (!actualFileId) {
-                  continue;
-                }
+          // Fetch details concurrently; Promise.all keeps the referenced order
+          const results = await Promise.all(
+            fileIds.map(async (fileId): Promise<SearchResult | null> => {
+              const normalizedId = fileId?.trim();
+              if (!normalizedId) {
+                return null;
+              }
 
-                files.push({
-                  file_id: actualFileId,
-                  file_name: fileData.name,
-                  file_path: fileData.path,
-                  file_type: fileData.type,
-                  category: fileData.category,
-                  size: fileData.size,
-                  created_at: fileData.created_at,
-                  tags: fileData.tags || [],
-                });
+              try {
+                const response = await apiService.getFileDetail(normalizedId);
+                if (response.success && response.data) {
+                  const fileData = response.data as {
+                    id?: string;
+                    file_id?: string;
+                    name: string;
+                    path: string;
+                    type: string;
+                    category: string;
+                    size: number;
+                    created_at: string;
+                    tags?: string[];
+                  };
+
+                  const actualFileId = fileData.file_id || fileData.id;
+                  if (!actualFileId) {
+                    return null;
+                  }
+
+                  return {
+                    file_id: actualFileId,
+                    file_name: fileData.name,
+                    file_path: fileData.path,
+                    file_type: fileData.type,
+                    category: fileData.category,
+                    size: fileData.size,
+                    created_at: fileData.created_at,
+                    tags: fileData.tags || [],
+                  };
+                }
+              } catch (innerError) {
+                console.warn("Skip invalid referenced file id", innerError);
               }
-            } catch (innerError) {
-              console.warn("Skip invalid referenced file id", innerError);
-            }
-          }
+              return null;
+            })
+          );
+          const files = results.filter((file): file is SearchResult => file !== null);
           setReferencedFiles(files);
         } catch (error) {
           console.error("Failed to load referenced files:", error);
@@ -90,12 +90,15 @@ function resolveKey(dictionary: TranslationDictionary, key: string): string | Tr
   return current
 }
 
+// Matches `{name}` placeholders; compiled once and applied in a single pass
+const PLACEHOLDER_RE = /\{([^{}]+)\}/g
+
 function formatParams(template: string, params?: Record<string, string | number>): string {
   if (!params) {
     return template
   }
 
-  return Object.entries(params).reduce<string>((value, [key, paramValue]) => {
-    return value.replace(new RegExp(`{${key}}`, 'g'), String(paramValue))
-  }, template)
+  return template.replace(PLACEHOLDER_RE, (match, key: string) =>
+    Object.prototype.hasOwnProperty.call(params, key) ? String(params[key]) : match
+  )
 }